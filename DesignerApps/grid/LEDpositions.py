@@ -1,4 +1,5 @@
 import tkinter as tk
+import tkinter.font as tkfont
 import json
 
 class GridApp:
@@ -18,47 +19,74 @@ class GridApp:
         self.key_sequence = {}
         self.cell_data = {}  # Dictionary to store highlighted cells and their associated keys and values
         self.canvas = tk.Canvas(root)
-        self.frame = tk.Frame(self.canvas)
+        self.cells = {}  # (row, col) -> (rectangle item, text item) on the canvas
         self.scroll_x = tk.Scrollbar(root, orient="horizontal", command=self.canvas.xview)
         self.scroll_y = tk.Scrollbar(root, orient="vertical", command=self.canvas.yview)
         self.canvas.configure(xscrollcommand=self.scroll_x.set, yscrollcommand=self.scroll_y.set)
         self.scroll_x.pack(side="bottom", fill="x")
         self.scroll_y.pack(side="right", fill="y")
         self.canvas.pack(side="left", fill="both", expand=True)
-        self.canvas.create_window((0, 0), window=self.frame, anchor="nw")
-        self.frame.bind("<Configure>", self.on_frame_configure)
         self.create_grid()
         self.root.bind("<KeyRelease>", self.store_key)  # Bind key releas 
         self.led_positions_file = config['led_positions_file']
         self.load_highlighted_cells()  # Load highlighted cells from JSON file
 
-    def on_frame_configure(self, event):
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-
     def create_grid(self):
+        # One canvas for the whole grid, a rectangle and a text item per cell, sized like the
+        # tk.Label cells it replaces
+        font = tkfont.nametofont("TkDefaultFont")
+        padding = 2 * (self.borderwidth + 1)
+        self.cell_px_width = self.cell_width * font.measure("0") + padding
+        self.cell_px_height = self.cell_height * font.metrics("linespace") + padding
+        self.grid_x = self.cell_px_width  # Row headers on the left
+        self.grid_y = self.header_height * font.metrics("linespace") + padding  # Column headers on top
         # Add column headers
         for col in range(self.cols):
-            header = tk.Label(self.frame, text=str(col), borderwidth=0, relief=self.relief, width=self.cell_width, height=self.header_height)
-            header.grid(row=0, column=col+1)  # Shift column numbering one cell to the right
+            x = self.grid_x + col * self.cell_px_width + self.cell_px_width // 2
+            self.canvas.create_text(x, self.grid_y // 2, text=str(col))
         # Add row headers
-        for row in range(1, self.rows + 1):
-            header = tk.Label(self.frame, text=str(row-1), borderwidth=self.borderwidth, width=self.cell_width, height=self.header_height)
-            header.grid(row=row, column=0)
-        # Adjust row and column start to 1 to accommodate headers
-        for row in range(1, self.rows + 1):
-            for col in range(1, self.cols + 1):
-                cell_text = f"c:{col-1},r:{row-1}\n"
-                cell = tk.Label(self.frame, text=cell_text, borderwidth=self.borderwidth, relief=self.relief, width=self.cell_width, height=self.cell_height, bg=self.bg_color, highlightbackground=self.highlight_color)
-                cell.grid(row=row, column=col)
-                cell.bind("<Button-1>", self.toggle_highlight)  # Bind left-click event to toggle highlight
+        for row in range(self.rows):
+            y = self.grid_y + row * self.cell_px_height + self.cell_px_height // 2
+            self.canvas.create_text(self.grid_x // 2, y, text=str(row))
+        for row in range(self.rows):
+            for col in range(self.cols):
+                x = self.grid_x + col * self.cell_px_width
+                y = self.grid_y + row * self.cell_px_height
+                rect = self.canvas.create_rectangle(x, y, x + self.cell_px_width, y + self.cell_px_height,
+                                                    fill=self.bg_color, outline="black", width=self.borderwidth,
+                                                    tags="cell")
+                text = self.canvas.create_text(x + self.cell_px_width // 2, y + self.cell_px_height // 2,
+                                               text=f"c:{col},r:{row}\n", justify="center", tags="cell")
+                self.cells[(row, col)] = (rect, text)
+        self.canvas.tag_bind("cell", "<Button-1>", self.toggle_highlight)  # Left-click toggles highlight
+        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+
+    def cell_at(self, event):
+        """(row, col) of the cell under a mouse event, None outside the grid."""
+        col = int(self.canvas.canvasx(event.x) - self.grid_x) // self.cell_px_width
+        row = int(self.canvas.canvasy(event.y) - self.grid_y) // self.cell_px_height
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row, col
+        return None
+
+    def set_cell(self, row, col, text=None, bg=None):
+        """Update the text and/or color of one cell."""
+        cell = self.cells.get((row, col))
+        if cell is None:
+            return  # Outside the configured grid
+        if bg is not None:
+            self.canvas.itemconfigure(cell[0], fill=bg)
+        if text is not None:
+            self.canvas.itemconfigure(cell[1], text=text)
 
     def toggle_highlight(self, event):
-        focused_widget = self.root.focus_get()
-        key = event.char if isinstance(focused_widget, tk.Entry) else None
-        current_color = event.widget.cget("bg")
+        cell = self.cell_at(event)
+        if cell is None:
+            return
+        row, col = cell
+        current_color = self.canvas.itemcget(self.cells[cell][0], "fill")
         new_color = self.bg_color if current_color == self.highlighted_color else self.highlighted_color
-        cell_info = event.widget.grid_info()
-        cell_position = f"{cell_info['row'] - 1},{cell_info['column'] - 1}"
+        cell_position = f"{row},{col}"
         
         if new_color == self.highlighted_color:
             ref_number = len(self.highlighted_cells)
@@ -72,10 +100,10 @@ class GridApp:
                 del self.key_sequence[cell_position]  # Remove key sequence data when unhighlighted
             self.renumber_mod_sequence(mod_value)  # Renumber sequence numbers for the same mod value
             self.renumber_refs()  # Renumber the ref numbers
-            cell_text = f"c:{cell_info['column'] - 1},r:{cell_info['row'] - 1}\n"
-            event.widget.configure(text=cell_text)  # Remove mod and ref display
+            cell_text = f"c:{col},r:{row}\n"
+            self.set_cell(row, col, text=cell_text)  # Remove mod and ref display
         
-        event.widget.configure(bg=new_color)  # Toggle cell color on left-click
+        self.set_cell(row, col, bg=new_color)  # Toggle cell color on left-click
         self.save_highlighted_cells()
 
     def renumber_mod_sequence(self, mod_value):
@@ -87,9 +115,7 @@ class GridApp:
                 row, col = map(int, cell_position.split(','))
                 ref_number = self.highlighted_cells[cell_position]["ref"]
                 cell_text = f"c:{col},r:{row}\nref:{ref_number}\nmod:{new_key_with_sequence}"
-                for widget in self.frame.grid_slaves():
-                    if widget.grid_info()['row'] == row + 1 and widget.grid_info()['column'] == col + 1:
-                        widget.configure(text=cell_text)
+                self.set_cell(row, col, text=cell_text)
                 sequence += 1
 
     def renumber_refs(self):
@@ -110,9 +136,7 @@ class GridApp:
             row, col = map(int, cell_position.split(','))
             ref_number = self.highlighted_cells[cell_position]["ref"]
             cell_text = f"c:{col},r:{row}\nref:{ref_number}\nmod:{new_key_with_sequence}"
-            for widget in self.frame.grid_slaves():
-                if widget.grid_info()['row'] == row + 1 and widget.grid_info()['column'] == col + 1:
-                    widget.configure(text=cell_text)
+            self.set_cell(row, col, text=cell_text)
         self.key_sequence = new_key_sequence
         self.renumber_refs()  # Renumber the ref numbers
 
@@ -127,9 +151,7 @@ class GridApp:
                 for cell_position, cell_data in self.highlighted_cells.items():
                     row, col = map(int, cell_position.split(','))
                     cell_text = f"c:{col},r:{row}\nref:{cell_data['ref']}\nmod:{cell_data['mod']}"
-                    for widget in self.frame.grid_slaves():
-                        if widget.grid_info()['row'] == row + 1 and widget.grid_info()['column'] == col + 1:
-                            widget.configure(bg=self.highlighted_color, text=cell_text)
+                    self.set_cell(row, col, text=cell_text, bg=self.highlighted_color)
         except FileNotFoundError:
             self.highlighted_cells = {}
             self.save_highlighted_cells()  # Create the file if it doesn't exist
@@ -162,17 +184,14 @@ class GridApp:
             key_with_sequence = f"{mod_value},{next_sequence}"
             ref_number = self.highlighted_cells[last_highlighted]["ref"]
             cell_text = f"c:{col},r:{row}\nref:{ref_number}\nmod:{key_with_sequence}"
-            for widget in self.frame.grid_slaves():
-                if widget.grid_info()['row'] == row + 1 and widget.grid_info()['column'] == col + 1:
-                    widget.configure(text=cell_text)
+            self.set_cell(row, col, text=cell_text)
             self.highlighted_cells[last_highlighted]["mod"] = key_with_sequence
             self.cell_data[last_highlighted] = key_with_sequence  # Store in cell_data dictionary
             self.save_highlighted_cells()
             self.renumber_refs()  # Renumber the ref numbers
 
     def repaint_canvas(self):
-        for widget in self.frame.winfo_children():
-            widget.update_idletasks()
+        self.canvas.update_idletasks()
 
 if __name__ == "__main__":
     with open('config.json', 'r') as f:
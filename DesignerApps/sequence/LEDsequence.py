@@ -1,15 +1,32 @@
 import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import simpledialog
 import json
+import os
 
 # clicking on the cell will highlight it and add it to the sequence file
 # control + click on the cell will highlight the corresponding sequence value
 # shift + click on the cell will show editable fields for the cell
+# the Preview button plays the sequence on the grid, Bus check prints its I2C load (both need NumPy)
+# Ramp turns the highlighted node into a ramp from a start level to its LU over its S seconds (or back)
+# Repeat plays a block of nodes, starting at the highlighted one, several times
 
 SEQUENCE_FILE = "D_LED_sequence.json"  # Default sequence file name
+BUS_CHECK_FREQ = 400000  # I2C clock the Bus check button assumes, in Hz
+SAVE_DELAY_MS = 500  # Edits within this long of each other are written to disk together
+RAMP_CURVES = ("gamma", "linear")  # Same order as envelope.CURVES on the board
+
+def write_json(path, data):
+    # Write to a temporary file first so a crash mid-write never leaves a truncated file
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, path)
 
 class GridApp:
     def __init__(self, root, config):
         self.sequence_file = SEQUENCE_FILE
+        self.config = config
         self.root = root
         self.rows = config['rows']
         self.cols = config['cols']
@@ -25,26 +42,36 @@ class GridApp:
         self.key_sequence = {}
         self.cell_data = {}  # Dictionary to store highlighted cells and their associated keys and values
         self.canvas = tk.Canvas(root)
-        self.frame = tk.Frame(self.canvas)
+        self.cells = {}  # (row, col) -> (rectangle item, text item) on the canvas
         self.scroll_x = tk.Scrollbar(root, orient="horizontal", command=self.canvas.xview)
         self.scroll_y = tk.Scrollbar(root, orient="vertical", command=self.canvas.yview)
         self.canvas.configure(xscrollcommand=self.scroll_x.set, yscrollcommand=self.scroll_y.set)
         self.scroll_x.pack(side="bottom", fill="x")
         self.scroll_y.pack(side="right", fill="y")
         self.canvas.pack(side="left", fill="both", expand=True)
-        self.canvas.create_window((0, 0), window=self.frame, anchor="nw")
-        self.frame.bind("<Configure>", self.on_frame_configure)
         self.create_grid()
         self.root.bind("<KeyRelease>", self.store_key)  # Bind key releas 
         self.led_positions_file = config['led_positions_file']
         self.load_highlighted_cells()  # Load highlighted cells from JSON file
-        self.default_lumin = 30  # Default luminance
-        self.default_sleepsec = 0.25  # Default sleep seconds
-        self.default_waitsec = 0.25  # Default wait seconds
+        self.default_lumin = config.get('default_lumin', 30)  # Default luminance
+        self.default_sleepsec = config.get('default_sleepsec', 0.25)  # Default sleep seconds
+        self.default_waitsec = config.get('default_waitsec', 0.25)  # Default wait seconds
+        self.ref_index = {}  # ref number -> positions of its nodes in self.sequence
+        self.pending_save = None  # Tk after() id of the scheduled write, None when nothing is pending
+        self.config_dirty = False
 
         sequence_frame = tk.Frame(root)  # Create a frame for the sequence display and scrollbar
         sequence_frame.pack(side="right", fill="y", padx=5, pady=(self.header_height * 20, 0))  # Adjust top padding to align with header
 
+        preview_button = tk.Button(sequence_frame, text="Preview", command=self.open_preview)
+        preview_button.pack(side="top", anchor="w", pady=(0, 5))
+        bus_button = tk.Button(sequence_frame, text="Bus check", command=self.check_bus_budget)
+        bus_button.pack(side="top", anchor="w", pady=(0, 5))
+        ramp_button = tk.Button(sequence_frame, text="Ramp", command=self.toggle_ramp)
+        ramp_button.pack(side="top", anchor="w", pady=(0, 5))
+        repeat_button = tk.Button(sequence_frame, text="Repeat", command=self.add_repeat)
+        repeat_button.pack(side="top", anchor="w", pady=(0, 5))
+
         self.sequence_display = tk.Text(sequence_frame, width=46, state="disabled", wrap="none")  # Increase width to 50
         sequence_scrollbar = tk.Scrollbar(sequence_frame, orient="vertical", command=self.sequence_display.yview)  # Create a scrollbar
         self.sequence_display.configure(yscrollcommand=sequence_scrollbar.set)  # Link the scrollbar to the text widget
@@ -52,37 +79,63 @@ class GridApp:
         self.sequence_display.pack(side="left", fill="y")  # Pack the text widget
         sequence_scrollbar.pack(side="right", fill="y")  # Pack the scrollbar
 
-        self.initialize_sequence_file()  # Initialize the sequence file
-        self.update_sequence_display()  # Display existing sequence values in the sequence display pane
+        self.initialize_sequence_file()  # Initialize the sequence file, displaying existing sequence values
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)  # Bind cleanup function to window close event
         self.sequence_display.bind("<Delete>", self.delete_sequence_node)  # Bind delete key to delete sequence node
 
-    def on_frame_configure(self, event):
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-
     def create_grid(self):
+        # One canvas for the whole grid, a rectangle and a text item per cell, sized like the
+        # tk.Label cells it replaces
+        font = tkfont.nametofont("TkDefaultFont")
+        padding = 2 * (self.borderwidth + 1)
+        self.cell_px_width = self.cell_width * font.measure("0") + padding
+        self.cell_px_height = self.cell_height * font.metrics("linespace") + padding
+        self.grid_x = self.cell_px_width  # Row headers on the left
+        self.grid_y = self.header_height * font.metrics("linespace") + padding  # Column headers on top
         # Add column headers
         for col in range(self.cols):
-            header = tk.Label(self.frame, text=str(col), borderwidth=0, relief=self.relief, width=self.cell_width, height=self.header_height)
-            header.grid(row=0, column=col+1)  # Shift column numbering one cell to the right
+            x = self.grid_x + col * self.cell_px_width + self.cell_px_width // 2
+            self.canvas.create_text(x, self.grid_y // 2, text=str(col))
         # Add row headers
-        for row in range(1, self.rows + 1):
-            header = tk.Label(self.frame, text=str(row-1), borderwidth=self.borderwidth, width=self.cell_width, height=self.header_height)
-            header.grid(row=row, column=0)
-        # Adjust row and column start to 1 to accommodate headers
-        for row in range(1, self.rows + 1):
-            for col in range(1, self.cols + 1):
-                cell_text = f"x:{row-1},y:{col-1}\n"  # Change text to x and y
-                cell = tk.Label(self.frame, text=cell_text, borderwidth=self.borderwidth, relief=self.relief, 
-                                width=self.cell_width, height=self.cell_height, bg=self.bg_color, 
-                                highlightbackground=self.highlight_color)
-                cell.grid(row=row, column=col)
-                cell.bind("<Button-1>", self.toggle_highlight)  # Ensure left-click event is bound to toggle_highlight
+        for row in range(self.rows):
+            y = self.grid_y + row * self.cell_px_height + self.cell_px_height // 2
+            self.canvas.create_text(self.grid_x // 2, y, text=str(row))
+        for row in range(self.rows):
+            for col in range(self.cols):
+                x = self.grid_x + col * self.cell_px_width
+                y = self.grid_y + row * self.cell_px_height
+                rect = self.canvas.create_rectangle(x, y, x + self.cell_px_width, y + self.cell_px_height,
+                                                    fill=self.bg_color, outline="black", width=self.borderwidth,
+                                                    tags="cell")
+                text = self.canvas.create_text(x + self.cell_px_width // 2, y + self.cell_px_height // 2,
+                                               text=f"x:{row},y:{col}\n", justify="center", tags="cell")
+                self.cells[(row, col)] = (rect, text)
+        self.canvas.tag_bind("cell", "<Button-1>", self.toggle_highlight)  # Left-click adds the cell to the sequence
+        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+
+    def cell_at(self, event):
+        """(row, col) of the cell under a mouse event, None outside the grid."""
+        col = int(self.canvas.canvasx(event.x) - self.grid_x) // self.cell_px_width
+        row = int(self.canvas.canvasy(event.y) - self.grid_y) // self.cell_px_height
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row, col
+        return None
+
+    def set_cell(self, row, col, text=None, bg=None):
+        """Update the text and/or color of one cell."""
+        cell = self.cells.get((row, col))
+        if cell is None:
+            return  # Outside the configured grid
+        if bg is not None:
+            self.canvas.itemconfigure(cell[0], fill=bg)
+        if text is not None:
+            self.canvas.itemconfigure(cell[1], text=text)
 
     def toggle_highlight(self, event):
-        focused_widget = self.root.focus_get()
-        cell_info = event.widget.grid_info()
-        cell_position = f"{cell_info['row'] - 1},{cell_info['column'] - 1}"
+        cell = self.cell_at(event)
+        if cell is None:
+            return
+        cell_position = f"{cell[0]},{cell[1]}"
 
         if cell_position in self.highlighted_cells:
             print(f"Clicked: {cell_position}")
@@ -97,21 +150,18 @@ class GridApp:
 
             # Show editable fields only if the shift key is held
             if event.state & 0x0001:  # Check if the shift key is pressed
-                self.show_editable_fields(event.widget, cell_position)
+                self.show_editable_fields(self.canvas, cell_position)
 
     def highlight_sequence_value(self, ref_number):
         """Highlight the sequence value corresponding to the given ref_number."""
         self.sequence_display.tag_remove("highlight", "1.0", tk.END)  # Remove previous highlights
         self.sequence_display.tag_configure("highlight", background="yellow")  # Configure highlight style
 
-        # Search for the line containing the ref_number and highlight it
-        lines = self.sequence_display.get("1.0", tk.END).splitlines()
-        for i, line in enumerate(lines):
-            if line.startswith(f"{ref_number}."):  # Match the ref_number format in the sequence pane
-                start_index = f"{i + 1}.0"
-                end_index = f"{i + 1}.end"
-                self.sequence_display.tag_add("highlight", start_index, end_index)
-                break
+        # Highlight the line of the first node with this ref_number
+        positions = self.ref_index.get(ref_number)
+        if positions:
+            line = positions[0] + 1
+            self.sequence_display.tag_add("highlight", f"{line}.0", f"{line}.end")
 
     def show_editable_fields(self, widget, cell_position):
         # Create a popup frame for editing lu, s, and w values
@@ -120,7 +170,8 @@ class GridApp:
         popup.geometry("200x180")  # Adjusted height to ensure buttons are fully visible
 
         # Retrieve current values or set defaults
-        current_node = next((node for node in self.sequence if node["r"] == self.highlighted_cells[cell_position]["ref"]), {})
+        positions = self.ref_index.get(self.highlighted_cells[cell_position]["ref"])
+        current_node = self.sequence[positions[0]] if positions else {}
         lu_value = current_node.get("lu", 30)
         s_value = current_node.get("s", 0.25)
         w_value = current_node.get("w", 0.25)
@@ -148,32 +199,20 @@ class GridApp:
                 s = float(s_entry.get())
                 w = float(w_entry.get())
                 # Update the node in the sequence for the current cell only
-                for node in self.sequence:
-                    if node["r"] == self.highlighted_cells[cell_position]["ref"]:
-                        node["lu"] = lu
-                        node["s"] = s
-                        node["w"] = w
-                        break
-                # Update default values
+                positions = self.ref_index.get(self.highlighted_cells[cell_position]["ref"])
+                if positions:
+                    node = self.sequence[positions[0]]
+                    node["lu"] = lu
+                    node["s"] = s
+                    node["w"] = w
+                    self.replace_display_line(positions[0])
+                # Update default values, written to config.json with the sequence
                 self.default_lumin = lu
                 self.default_sleepsec = s
                 self.default_waitsec = w
+                self.config_dirty = True
 
-                # Update the config.json file with the new default values
-                try:
-                    with open('config.json', 'r') as f:
-                        config = json.load(f)
-                    config['default_lumin'] = self.default_lumin
-                    config['default_sleepsec'] = self.default_sleepsec
-                    config['default_waitsec'] = self.default_waitsec
-                    with open('config.json', 'w') as f:
-                        json.dump(config, f, indent=4)
-                except (FileNotFoundError, json.JSONDecodeError) as e:
-                    print(f"Error updating config.json: {e}")
-
-                # Save the updated sequence to the file
-                with open(self.sequence_file, 'w') as f:
-                    json.dump(self.sequence, f, indent=4)
+                self.schedule_save()
                 popup.destroy()
             except ValueError:
                 print("Invalid input. Please enter numeric values.")
@@ -204,17 +243,6 @@ class GridApp:
             return  # Do not save if ref number exceeds 63
 
         row, col = map(int, cell_position.split(','))
-        # Reload default values from config.json
-        try:
-            with open('config.json', 'r') as f:
-                config = json.load(f)
-            default_lumin = config.get('default_lumin', 30)
-            default_sleepsec = config.get('default_sleepsec', 0.25)
-            default_waitsec = config.get('default_waitsec', 0.25)
-        except (FileNotFoundError, json.JSONDecodeError):
-            default_lumin = 30
-            default_sleepsec = 0.25
-            default_waitsec = 0.25
 
         # Obtain the "m" value from the "mod" field in highlighted_cells
         mod_value = self.highlighted_cells[cell_position]["mod"]
@@ -228,29 +256,148 @@ class GridApp:
             "ch": ch,  # Add the "ch" element
             "x": row,
             "y": col,
-            "lu": default_lumin,
-            "s": default_sleepsec,
-            "w": default_waitsec
+            "lu": self.default_lumin,
+            "s": self.default_sleepsec,
+            "w": self.default_waitsec
         }
         self.sequence.append(node)  # Add the node to the in-memory sequence
+        self.ref_index.setdefault(ref_number, []).append(len(self.sequence) - 1)
 
-        try:
-            with open(self.sequence_file, 'w') as f:
-                json.dump(self.sequence, f, indent=4)  # Save the updated sequence to the file
-            self.update_sequence_display()  # Update the sequence display pane
-        except IOError as e:
-            print(f"Error saving to {self.sequence_file}: {e}")
+        self.sequence_display.config(state="normal")  # Enable editing temporarily
+        self.sequence_display.insert(tk.END, self.format_node(node))  # Add just the new line
+        self.sequence_display.config(state="disabled")  # Disable editing
+        self.schedule_save()
+
+    def format_node(self, node):
+        """One line of the sequence display pane."""
+        op = node.get("op")
+        if op == "repeat":
+            return f"REPEAT:{node['n']}x,NEXT:{node['len']}\n"
+        lu = node['lu']
+        if op == "ramp":
+            lu = f"{node.get('from', '')}->{node['lu']}/{node.get('curve', RAMP_CURVES[0])}"
+        return (f"{node['r']}.X:{node['x']},Y:{node['y']},"
+                f"LU:{lu},S:{node['s']},W:{node['w']},"
+                f"M:{node['m']},CH:{node['ch']}\n")  # Add "m" and "ch"
+
+    def rebuild_ref_index(self):
+        self.ref_index = {}
+        for i, node in enumerate(self.sequence):
+            if "r" in node:  # Repeat markers are not tied to a cell
+                self.ref_index.setdefault(node["r"], []).append(i)
+
+    def highlighted_position(self):
+        """Position in the sequence of the highlighted display line, None when nothing is highlighted."""
+        highlighted_ranges = self.sequence_display.tag_ranges("highlight")
+        if highlighted_ranges:
+            position = int(str(highlighted_ranges[0]).split(".")[0]) - 1  # Convert to 0-based index
+            if 0 <= position < len(self.sequence):
+                return position
+        return None
+
+    def enclosing_repeats(self, position):
+        """Positions of the repeat markers whose block covers the node at ``position``."""
+        return [i for i, node in enumerate(self.sequence[:position])
+                if node.get("op") == "repeat" and position <= i + node["len"]]
+
+    def toggle_ramp(self):
+        """Turn the highlighted node into a ramp to its LU, or a ramp back into a plain step."""
+        position = self.highlighted_position()
+        if position is None or "r" not in self.sequence[position]:
+            print("Highlight a node first (control + click its cell).")
+            return
+        node = self.sequence[position]
+        if node.get("op") == "ramp":
+            for key in ("op", "from", "curve"):
+                node.pop(key, None)
+        else:
+            start = simpledialog.askstring("Ramp", "Start LU (blank: from the current level):", parent=self.root)
+            if start is None:
+                return
+            curve = simpledialog.askstring("Ramp", f"Curve ({', '.join(RAMP_CURVES)}):",
+                                           initialvalue=RAMP_CURVES[0], parent=self.root)
+            if curve not in RAMP_CURVES:
+                print(f"Unknown curve {curve}.")
+                return
+            try:
+                start = float(start) if start.strip() else None
+            except ValueError:
+                print("Invalid input. Please enter a numeric start level.")
+                return
+            node["op"] = "ramp"
+            if start is not None:
+                node["from"] = start
+            node["curve"] = curve
+        self.replace_display_line(position)
+        self.schedule_save()
+
+    def add_repeat(self):
+        """Insert a repeat marker before the highlighted node, covering it and the nodes after it."""
+        position = self.highlighted_position()
+        if position is None:
+            print("Highlight the first node of the block first (control + click its cell).")
+            return
+        enclosing = self.enclosing_repeats(position)
+        # The block can't run past the end of the innermost repeat it sits in
+        block_end = min([len(self.sequence)] + [i + 1 + self.sequence[i]["len"] for i in enclosing])
+        remaining = block_end - position
+        times = simpledialog.askinteger("Repeat", "Play the block how many times?",
+                                        minvalue=2, initialvalue=2, parent=self.root)
+        if times is None:
+            return
+        length = simpledialog.askinteger("Repeat", "How many nodes in the block?", minvalue=1,
+                                         maxvalue=remaining, initialvalue=remaining, parent=self.root)
+        if length is None:
+            return
+        for i in enclosing:
+            self.sequence[i]["len"] += 1  # The marker joins the blocks it sits in
+        self.sequence.insert(position, {"op": "repeat", "n": times, "len": length})
+        self.rebuild_ref_index()
+        self.sequence_display.config(state="normal")
+        self.sequence_display.insert(f"{position + 1}.0", self.format_node(self.sequence[position]))
+        self.sequence_display.config(state="disabled")
+        self.schedule_save()
 
     def update_sequence_display(self):
-        """Update the sequence display pane with the current sequence values."""
+        """Redraw the whole sequence display pane, only needed after loading a file."""
         self.sequence_display.config(state="normal")  # Enable editing temporarily
         self.sequence_display.delete(1.0, tk.END)  # Clear the display
-        for node in self.sequence:
-            self.sequence_display.insert(tk.END, f"{node['r']}.X:{node['x']},Y:{node['y']},"
-                                                 f"LU:{node['lu']},S:{node['s']},W:{node['w']},"
-                                                 f"M:{node['m']},CH:{node['ch']}\n")  # Add "m" and "ch"
+        self.sequence_display.insert(tk.END, "".join(self.format_node(node) for node in self.sequence))
         self.sequence_display.config(state="disabled")  # Disable editing
 
+    def replace_display_line(self, position):
+        """Redraw the display line of the node at ``position`` in the sequence."""
+        line = position + 1
+        self.sequence_display.config(state="normal")
+        self.sequence_display.delete(f"{line}.0", f"{line + 1}.0")
+        self.sequence_display.insert(f"{line}.0", self.format_node(self.sequence[position]))
+        self.sequence_display.config(state="disabled")
+
+    def schedule_save(self):
+        """Write the sequence (and changed defaults) once edits pause for SAVE_DELAY_MS."""
+        if self.pending_save is not None:
+            self.root.after_cancel(self.pending_save)
+        self.pending_save = self.root.after(SAVE_DELAY_MS, self.save_now)
+
+    def save_now(self):
+        if self.pending_save is not None:
+            self.root.after_cancel(self.pending_save)
+            self.pending_save = None
+        try:
+            write_json(self.sequence_file, self.sequence)
+        except IOError as e:
+            print(f"Error saving to {self.sequence_file}: {e}")
+        if self.config_dirty:
+            # Update the config.json file with the new default values
+            self.config['default_lumin'] = self.default_lumin
+            self.config['default_sleepsec'] = self.default_sleepsec
+            self.config['default_waitsec'] = self.default_waitsec
+            try:
+                write_json('config.json', self.config)
+                self.config_dirty = False
+            except IOError as e:
+                print(f"Error updating config.json: {e}")
+
     def renumber_mod_sequence(self, mod_value):
         sequence = 0
         for cell_position, cell_data in self.highlighted_cells.items():
@@ -260,9 +407,7 @@ class GridApp:
                 row, col = map(int, cell_position.split(','))
                 ref_number = self.highlighted_cells[cell_position]["ref"]
                 cell_text = f"c:{col},r:{row}\nref:{ref_number}\nmod:{new_key_with_sequence}"
-                for widget in self.frame.grid_slaves():
-                    if widget.grid_info()['row'] == row + 1 and widget.grid_info()['column'] == col + 1:
-                        widget.configure(text=cell_text)
+                self.set_cell(row, col, text=cell_text)
                 sequence += 1
 
     def renumber_refs(self):
@@ -283,9 +428,7 @@ class GridApp:
             row, col = map(int, cell_position.split(','))
             ref_number = self.highlighted_cells[cell_position]["ref"]
             cell_text = f"c:{col},r:{row}\nref:{ref_number}\nmod:{new_key_with_sequence}"
-            for widget in self.frame.grid_slaves():
-                if widget.grid_info()['row'] == row + 1 and widget.grid_info()['column'] == col + 1:
-                    widget.configure(text=cell_text)
+            self.set_cell(row, col, text=cell_text)
         self.key_sequence = new_key_sequence
         self.renumber_refs()  # Renumber the ref numbers
 
@@ -300,9 +443,7 @@ class GridApp:
                 for cell_position, cell_data in self.highlighted_cells.items():
                     row, col = map(int, cell_position.split(','))
                     cell_text = f"x:{row},y:{col}\nref:{cell_data['ref']}\nmod:{cell_data['mod']}"  # Change text to x and y
-                    for widget in self.frame.grid_slaves():
-                        if widget.grid_info()['row'] == row + 1 and widget.grid_info()['column'] == col + 1:
-                            widget.configure(bg=self.highlighted_color, text=cell_text)
+                    self.set_cell(row, col, text=cell_text, bg=self.highlighted_color)
         except FileNotFoundError:
             self.highlighted_cells = {}
             self.save_highlighted_cells()  # Create the file if it doesn't exist
@@ -335,51 +476,67 @@ class GridApp:
             key_with_sequence = f"{mod_value},{next_sequence}"
             ref_number = self.highlighted_cells[last_highlighted]["ref"]
             cell_text = f"c:{col},r:{row}\nref:{ref_number}\nmod:{key_with_sequence}"
-            for widget in self.frame.grid_slaves():
-                if widget.grid_info()['row'] == row + 1 and widget.grid_info()['column'] == col + 1:
-                    widget.configure(text=cell_text)
+            self.set_cell(row, col, text=cell_text)
             self.highlighted_cells[last_highlighted]["mod"] = key_with_sequence
             self.cell_data[last_highlighted] = key_with_sequence  # Store in cell_data dictionary
             self.save_highlighted_cells()
             self.renumber_refs()  # Renumber the ref numbers
 
     def repaint_canvas(self):
-        for widget in self.frame.winfo_children():
-            widget.update_idletasks()
+        self.canvas.update_idletasks()
 
     def initialize_sequence_file(self):
         try:
             with open(self.sequence_file, 'r') as f:
                 self.sequence = json.load(f)  # Load existing sequence file
+            self.rebuild_ref_index()
             self.update_sequence_display()  # Update the sequence display pane with loaded values
         except (FileNotFoundError, json.JSONDecodeError):  # Handle missing or invalid file
             self.sequence = []  # Initialize an empty sequence if the file doesn't exist or is invalid
             with open(self.sequence_file, 'w') as f:
                 json.dump(self.sequence, f, indent=4)
 
+    def open_preview(self):
+        """Play the current sequence on the grid in a preview window."""
+        try:
+            from preview import PreviewPlayer  # Needs NumPy, only loaded when previewing
+        except ImportError as e:
+            print(f"Preview needs NumPy: {e}")
+            return
+        PreviewPlayer(self, self.sequence)
+
+    def check_bus_budget(self):
+        """Print where the current sequence needs more I2C time per tick than the bus has."""
+        try:
+            import busbudget  # Needs NumPy, only loaded when checking
+        except ImportError as e:
+            print(f"Bus check needs NumPy: {e}")
+            return
+        busbudget.report(self.sequence_file, self.sequence, BUS_CHECK_FREQ)
+
     def on_close(self):
-        # Save the sequence to the file before closing
-        with open(self.sequence_file, 'w') as f:
-            json.dump(self.sequence, f, indent=4)
+        # Save the sequence to the file before closing, including any write still pending
+        self.save_now()
         self.root.destroy()  # Close the application
 
     def delete_sequence_node(self, event):
         """Delete the sequenced node corresponding to the highlighted sequence text."""
         try:
             # Get the currently highlighted text
-            highlighted_ranges = self.sequence_display.tag_ranges("highlight")
-            if highlighted_ranges:
-                start_index = str(highlighted_ranges[0])  # Convert to string before splitting
-                line_number = int(start_index.split(".")[0]) - 1  # Convert to 0-based index
-                if 0 <= line_number < len(self.sequence):
-                    print(f"Deleting sequence node: {self.sequence[line_number]}")
-                    # Remove the node from the sequence
-                    del self.sequence[line_number]
-                    # Save the updated sequence to the file
-                    with open(self.sequence_file, 'w') as f:
-                        json.dump(self.sequence, f, indent=4)
-                    # Update the sequence display pane
-                    self.update_sequence_display()
+            line_number = self.highlighted_position()
+            if line_number is not None:
+                print(f"Deleting sequence node: {self.sequence[line_number]}")
+                # Remove the node from the sequence, and from the blocks of the repeats around it.
+                # Deleting a repeat marker leaves its nodes in place, played once.
+                for i in self.enclosing_repeats(line_number):
+                    self.sequence[i]["len"] -= 1
+                del self.sequence[line_number]
+                self.rebuild_ref_index()  # Later nodes moved up one position
+                # Remove just that line from the sequence display pane
+                self.sequence_display.config(state="normal")
+                self.sequence_display.delete(f"{line_number + 1}.0", f"{line_number + 2}.0")
+                self.sequence_display.config(state="disabled")
+                self.schedule_save()
         except Exception as e:
             print(f"Error deleting sequence node: {e}")
 
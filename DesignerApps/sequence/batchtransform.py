@@ -0,0 +1,132 @@
+"""
+Apply brightness and timing transforms to a whole sequence library from the command line.
+
+    python batchtransform.py ../../micropython/led_sequencer/sequences/*.json --scale lu 90 --clamp lu 1 100
+    python batchtransform.py sequences/*.json --stretch 1.25 --out retuned/
+
+Transforms run in the order given and can be repeated:
+
+    --scale KEY PERCENT     multiply by PERCENT / 100, like changejsonvalues.modify_values()
+    --offset KEY DELTA      add DELTA
+    --clamp KEY MIN MAX     limit to MIN..MAX
+    --stretch FACTOR        scale the timing keys (s and w) by FACTOR
+
+A transform of lu also applies to from, a ramp's start level, so a ramp keeps its shape
+relative to the level it ends on. Name from on its own to change only the start levels.
+
+Each key is pulled out of a file into one NumPy column with changejsonvalues'
+get_column(), every transform is applied to the column at once and set_column() stores
+the results, so values that are not numbers are skipped and the rest rounded to 2
+decimals exactly as modify_values() does. A file whose top level is not a list of
+nodes is reported as failed. Files are processed in parallel, and each is written to a
+temporary file first and renamed over the target, so an interrupted run never leaves a
+half-written sequence. Needs NumPy.
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from changejsonvalues import get_column, set_column
+
+KEYS = ("lu", "from", "s", "w")  # "from" is the start level of a ramp node
+TIMING_KEYS = ("s", "w")
+LEVEL_KEYS = ("lu", "from")  # A transform of "lu" applies to both
+
+def transform_values(json_data, transforms):
+    """Apply transforms [(op, key, args...)] to a list of sequence nodes in place, returns it."""
+    columns = {}
+    for op, key, *args in transforms:
+        if key not in columns:
+            # Numeric values of this key and the nodes they came from
+            nodes, values = get_column(json_data, key)
+            columns[key] = (nodes, np.array(values, dtype=float))
+        nodes, values = columns[key]
+        if op == "scale":
+            values *= args[0] / 100
+        elif op == "offset":
+            values += args[0]
+        elif op == "clamp":
+            np.clip(values, args[0], args[1], out=values)
+        else:
+            raise ValueError(f"Unknown transform '{op}'")
+    for key, (nodes, values) in columns.items():
+        set_column(nodes, key, values.tolist())
+    return json_data
+
+def write_json_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def transform_file(path, transforms, out_dir=None, dry_run=False):
+    """Transform one sequence file, returns (path written or None on dry run, number of nodes)."""
+    with open(path, "r") as f:
+        json_data = json.load(f)
+    if not isinstance(json_data, list) or not all(isinstance(item, dict) for item in json_data):
+        raise ValueError("not a sequence, the top level must be a list of nodes")
+    transform_values(json_data, transforms)
+    if dry_run:
+        return None, len(json_data)
+    target = os.path.join(out_dir, os.path.basename(path)) if out_dir else path
+    write_json_atomic(target, json_data)
+    return target, len(json_data)
+
+class AppendTransform(argparse.Action):
+    """Collect every transform option into one list, in command line order."""
+    def __call__(self, parser, namespace, values, option_string=None):
+        transforms = getattr(namespace, self.dest) or []
+        op = option_string.lstrip("-")
+        if op == "stretch":
+            factor = float(values[0]) * 100
+            transforms.extend(("scale", key, factor) for key in TIMING_KEYS)
+        else:
+            key = values[0]
+            if key not in KEYS:
+                parser.error(f"{option_string}: key must be one of {', '.join(KEYS)}")
+            args = tuple(float(v) for v in values[1:])
+            keys = LEVEL_KEYS if key == "lu" else (key,)
+            transforms.extend((op, k, *args) for k in keys)
+        setattr(namespace, self.dest, transforms)
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Apply brightness and timing transforms to sequence files.")
+    parser.add_argument("files", nargs="+", help="sequence JSON files")
+    parser.add_argument("--scale", nargs=2, metavar=("KEY", "PERCENT"), action=AppendTransform, dest="transforms")
+    parser.add_argument("--offset", nargs=2, metavar=("KEY", "DELTA"), action=AppendTransform, dest="transforms")
+    parser.add_argument("--clamp", nargs=3, metavar=("KEY", "MIN", "MAX"), action=AppendTransform, dest="transforms")
+    parser.add_argument("--stretch", nargs=1, metavar="FACTOR", action=AppendTransform, dest="transforms")
+    parser.add_argument("--out", help="write to this directory instead of over the input files")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--dry-run", action="store_true", help="transform without writing anything")
+    args = parser.parse_args(argv)
+    if not args.transforms:
+        parser.error("no transforms given")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {path: pool.submit(transform_file, path, args.transforms, args.out, args.dry_run)
+                   for path in args.files}
+        for path, future in futures.items():
+            try:
+                target, count = future.result()
+            except (OSError, ValueError) as e:
+                print(f"{path}: failed, {e}", file=sys.stderr)
+                failed += 1
+                continue
+            print(f"{path}: {count} nodes" + (f" -> {target}" if target else " (dry run)"))
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,110 @@
+"""
+I2C bus budget check for sequence files.
+
+Renders each sequence tick by tick with the same envelope model the board plays
+(preview.render()) and works out what the animator has to send every 10 ms tick:
+one PCA9685.set_many() per module with changed channels, covering the span from the
+first to the last changed channel, as the driver's register cache trims it. Each
+transaction costs its bytes on the wire at the chosen clock plus a fixed software
+overhead. Ticks that need more time than the tick has are reported as overload
+windows, followed by a summary line per file. Modules after the PCA9685s (letters
+from "e") are WS2812 pixels and cost no I2C time.
+
+    python busbudget.py ../../micropython/led_sequencer/sequences/*.json [--freq 400000]
+
+Needs NumPy. analyze() can also be called from the designer on the sequence in memory.
+"""
+import argparse
+import json
+import numpy as np
+from preview import render, TICK_MS
+
+CHANNELS_PER_MODULE = 16
+LED_REG_WIDTH = 4  # Bytes per channel, LEDn_ON_L..LEDn_OFF_H
+FRAME_OVERHEAD_BYTES = 2  # Address and register byte of each write
+TRANSACTION_OVERHEAD_US = 100  # MicroPython call and driver time per set_many(), a rough board figure
+BUS_SHARE = 0.5  # Fraction of each tick the bus may take, the rest is for the event loop
+PCA_MODULES = 4  # Modules a-d are on the bus, same as PCA_ADDRESSES in runsequence.py
+
+def analyze(sequence, freq=400000, tick_ms=TICK_MS, overhead_us=TRANSACTION_OVERHEAD_US):
+    """
+    Per tick I2C demand of a sequence, as a dict of NumPy arrays (one entry per tick):
+    lit and changing LEDs, transactions, bytes on the wire and bus time in us.
+    """
+    leds, frames = render(sequence, tick_ms)
+    n_ticks = len(frames)
+    # The modules are blanked at start up, so tick 0 is compared against all off
+    previous = np.vstack((np.zeros((1, frames.shape[1]), dtype=frames.dtype), frames[:-1]))
+    changed = frames != previous
+
+    transactions = np.zeros(n_ticks, dtype=np.int32)
+    nbytes = np.zeros(n_ticks, dtype=np.int32)
+    modules = sorted({led[0] for led in leds if led[0] < PCA_MODULES})
+    for module in modules:
+        # Changed channels of this module laid out by channel number
+        by_channel = np.zeros((n_ticks, CHANNELS_PER_MODULE), dtype=bool)
+        for column, led in enumerate(leds):
+            if led[0] == module:
+                by_channel[:, led[1]] |= changed[:, column]
+        sent = by_channel.any(axis=1)
+        lo = np.argmax(by_channel, axis=1)
+        hi = CHANNELS_PER_MODULE - 1 - np.argmax(by_channel[:, ::-1], axis=1)
+        transactions += sent
+        nbytes += np.where(sent, FRAME_OVERHEAD_BYTES + (hi - lo + 1) * LED_REG_WIDTH, 0)
+
+    bus_us = nbytes * 9 * 1000000 / freq + transactions * overhead_us  # 9 clocks per byte
+    return {
+        "lit": np.count_nonzero(frames, axis=1),
+        "changing": np.count_nonzero(changed, axis=1),
+        "transactions": transactions,
+        "bytes": nbytes,
+        "bus_us": bus_us,
+    }
+
+def overload_windows(bus_us, capacity_us):
+    """(first tick, last tick) of each run of ticks needing more than capacity_us"""
+    over = np.concatenate(([False], bus_us > capacity_us, [False]))
+    edges = np.flatnonzero(over[1:] != over[:-1])
+    return list(zip(edges[0::2], edges[1::2] - 1))
+
+def report(name, sequence, freq, tick_ms=TICK_MS, bus_share=BUS_SHARE, overhead_us=TRANSACTION_OVERHEAD_US):
+    """Print the overload windows and summary of one sequence, returns the number of overloaded ticks"""
+    demand = analyze(sequence, freq, tick_ms, overhead_us)
+    capacity_us = tick_ms * 1000 * bus_share
+    bus_us = demand["bus_us"]
+    windows = overload_windows(bus_us, capacity_us)
+    tick_s = tick_ms / 1000
+    for first, last in windows:
+        peak = first + int(np.argmax(bus_us[first:last + 1]))
+        print(f"  {name} {first * tick_s:.2f}-{(last + 1) * tick_s:.2f} s: "
+              f"peak {bus_us[peak] / capacity_us:.0%} of budget, {demand['changing'][peak]} LEDs changing, "
+              f"{demand['transactions'][peak]} writes, {demand['bytes'][peak]} bytes")
+    overloaded = int(np.count_nonzero(bus_us > capacity_us))
+    print(f"{name}: {len(bus_us) * tick_s:.1f} s, peak {demand['lit'].max()} lit / "
+          f"{demand['changing'].max()} changing, max {demand['transactions'].max()} writes "
+          f"{demand['bytes'].max()} bytes per tick, bus {bus_us.mean() / capacity_us:.0%} avg "
+          f"{bus_us.max() / capacity_us:.0%} peak of budget, {overloaded} ticks over in {len(windows)} windows")
+    return overloaded
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check sequence files against the I2C bus budget.")
+    parser.add_argument("files", nargs="+", help="sequence JSON files")
+    parser.add_argument("--freq", type=int, default=400000, help="I2C clock in Hz (default 400000)")
+    parser.add_argument("--tick-ms", type=int, default=TICK_MS, help="animator tick in ms (default %(default)s)")
+    parser.add_argument("--bus-share", type=float, default=BUS_SHARE,
+                        help="fraction of each tick the bus may use (default %(default)s)")
+    parser.add_argument("--overhead-us", type=float, default=TRANSACTION_OVERHEAD_US,
+                        help="software time per write in us (default %(default)s)")
+    args = parser.parse_args(argv)
+
+    failing = 0
+    for path in args.files:
+        with open(path, "r") as f:
+            sequence = json.load(f)
+        if report(path, sequence, args.freq, args.tick_ms, args.bus_share, args.overhead_us):
+            failing += 1
+    print(f"{failing} of {len(args.files)} files exceed the bus budget at {args.freq // 1000} kHz")
+    return 1 if failing else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,9 @@
 import json
-import tkinter as tk
-from tkinter import filedialog, simpledialog, messagebox
+try:
+    import tkinter as tk
+    from tkinter import filedialog, simpledialog, messagebox
+except ImportError:
+    tk = None  # Headless, e.g. for batchtransform.py, only the value functions are usable
 
 def select_json_file():
     """Open a file dialog to select a JSON file."""
@@ -10,14 +13,29 @@ def select_json_file():
     )
     return file_path
 
-def modify_values(json_data, key, percentage):
-    """Modify the specified key's values by a percentage."""
+def get_column(json_data, key):
+    """Return the items with a number under key and those numbers, skipping invalid values."""
+    items = []
+    values = []
     for item in json_data:
         if key in item:
-            try:
-                item[key] = round(item[key] * (percentage / 100), 2)
-            except (TypeError, ValueError):
+            value = item[key]
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                items.append(item)
+                values.append(value)
+            else:
                 print(f"Skipping invalid value for key '{key}' in item: {item}")
+    return items, values
+
+def set_column(items, key, values):
+    """Store values back under key in the items get_column() returned, rounded to 2 decimals."""
+    for item, value in zip(items, values):
+        item[key] = round(value, 2)
+
+def modify_values(json_data, key, percentage):
+    """Modify the specified key's values by a percentage."""
+    items, values = get_column(json_data, key)
+    set_column(items, key, [value * (percentage / 100) for value in values])
     return json_data
 
 def main():
@@ -0,0 +1,203 @@
+import os
+import sys
+import time
+import numpy as np
+
+# The envelope model the board plays, shared with micropython/led_sequencer
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "micropython", "led_sequencer"))
+import envelope
+import binsequence
+
+TICK_MS = 10  # Same envelope step as the board's animator
+REFRESH_MS = 33  # How often the preview redraws while playing, frames in between are skipped
+_ENVELOPE = 0  # Kinds of render events
+_LEVEL = 1
+_TRANSITION = 2
+OFF_COLOR = (0, 0, 0)
+FIREFLY_COLOR = (255, 230, 60)  # Cell color at full brightness
+
+_envelopes = {}
+
+def full_envelope(peak, n):
+    """The whole up and down envelope the animator plays, 2n 12 bit duty cycles ending at 0."""
+    key = (peak, n)
+    table = _envelopes.get(key)
+    if table is None:
+        up = np.frombuffer(envelope.get(peak, n), dtype=np.uint16)
+        table = np.concatenate((up, up[-2::-1], np.zeros(1, dtype=np.uint16)))
+        _envelopes[key] = table
+    return table
+
+def render(sequence, tick_ms=TICK_MS):
+    """
+    Render a sequence into a frames x LEDs matrix of 12 bit duty cycles, one frame per tick.
+
+    Follows runsequence.run_sequence(): a step on a new module and channel starts a fade
+    envelope, a repeat of the last one sets its level and holds it for its sleep time too.
+    Ramps move on from the LED's current level and hold the new one, repeat blocks are
+    played out. Like the animator, an envelope or ramp cuts off the one before it on that
+    LED, and a level set while one plays is overwritten by it. Returns a (module, channel,
+    x, y) tuple per LED column, module numbered from 0 for "a", and the matrix.
+    """
+    tick_s = tick_ms / 1000
+    columns = {}  # (module, channel) -> column
+    leds = []
+    for node in sequence:
+        if "m" in node:  # Repeat markers have no LED
+            key = (ord(node["m"]) - ord("a"), node["ch"])
+            if key not in columns:
+                columns[key] = len(leds)
+                leds.append((key[0], key[1], node["x"], node["y"]))
+    events = [[] for _ in leds]  # Per column: (frame, kind, envelope or ramp ticks, level, curve)
+    t_ms = 0
+    n_frames = 1
+    last = None
+    for op, module, ch, lu, sleeplen, wait, curve in binsequence.node_steps(sequence):
+        key = (module, ch)
+        frame = t_ms // tick_ms
+        step_ms = int(wait * 1000)
+        if op != binsequence.OP_STEP:
+            n = int(sleeplen / tick_s) if op == binsequence.OP_RAMP else 0
+            events[columns[key]].append((frame, _TRANSITION, n, envelope.lu_to_duty(lu), curve))
+            n_frames = max(n_frames, frame + n + 1)
+            step_ms += int(sleeplen * 1000)
+        elif key != last:
+            n = max(1, min(envelope.MAX_TICKS, int(sleeplen / tick_s)))
+            table = full_envelope(envelope.lu_to_duty(lu), n)
+            events[columns[key]].append((frame, _ENVELOPE, table, 0, 0))
+            n_frames = max(n_frames, frame + len(table))
+        else:
+            # Animator.set_level() goes through the driver's 16 bit duty cycle
+            events[columns[key]].append((frame, _LEVEL, None, int(lu / 100 * 0xFFFF) >> 4, 0))
+            step_ms += int(sleeplen * 1000)
+        last = key
+        t_ms += step_ms
+    n_frames = max(n_frames, t_ms // tick_ms + 1)
+    frames = np.zeros((n_frames, len(leds)), dtype=np.uint16)
+
+    for column, column_events in enumerate(events):
+        table = None  # Envelope or ramp playing, from frame ``start``
+        start = 0
+        after = 0  # Level once nothing plays
+        written = (-1, 0)  # (frame, level) of the last level written straight to the frame buffer
+        for i, (frame, kind, ticks, level, curve) in enumerate(column_events):
+            stop = column_events[i + 1][0] if i + 1 < len(column_events) else n_frames
+            playing = table is not None and frame < start + len(table)
+            if kind == _ENVELOPE:
+                table, start, after = ticks, frame, 0
+            elif kind == _LEVEL:
+                written = (frame, level)
+                if not playing:
+                    table, after = None, level
+            elif ticks < 1:
+                written = (frame, level)
+                table, after = None, level
+            else:
+                # The ramp starts from whatever the animator last sent
+                current = written[1] if written[0] == frame else frames[frame - 1, column] if frame else 0
+                table = np.frombuffer(envelope.transition(int(current), level, ticks, curve), dtype=np.uint16)
+                start, after = frame, level
+            end = frame
+            if table is not None and frame < start + len(table):
+                end = min(start + len(table), stop)
+                frames[frame:end, column] = table[frame - start:end - start]
+            frames[end:stop, column] = after
+    return leds, frames
+
+def palette(steps=256):
+    colors = []
+    for i in range(steps):
+        rgb = [int(off + (on - off) * i / (steps - 1)) for off, on in zip(OFF_COLOR, FIREFLY_COLOR)]
+        colors.append("#{:02x}{:02x}{:02x}".format(*rgb))
+    return colors
+
+class PreviewPlayer:
+    """
+    Plays a rendered sequence on the designer's grid in real time, with play, pause and a
+    scrub bar in a small control window. Each redraw only touches the cells whose brightness
+    changed since the last one. Closing the window puts the grid colors back.
+    """
+    def __init__(self, app, sequence, tick_ms=TICK_MS):
+        self.app = app
+        self.canvas = app.canvas
+        self.tick_s = tick_ms / 1000
+        leds, frames = render(sequence, tick_ms)
+        # Drop LEDs placed outside the configured grid
+        keep = [i for i, led in enumerate(leds) if led[2:] in app.cells]
+        self.items = [app.cells[leds[i][2:]][0] for i in keep]
+        self.levels = (frames[:, keep] >> 4).astype(np.uint8)  # 12 bit duty to a palette index
+        self.palette = palette()
+        self.saved_fills = [self.canvas.itemcget(item, "fill") for item in self.items]
+        self.shown = None
+        self.frame = 0
+        self.playing = False
+        self.pending = None
+        self.scrubbing = False
+
+        import tkinter as tk  # Only the player needs Tk, render() also runs headless (busbudget)
+        self.window = tk.Toplevel(app.root)
+        self.window.title("Preview")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.play_button = tk.Button(self.window, text="Play", width=6, command=self.toggle_play)
+        self.play_button.pack(side="left", padx=5, pady=5)
+        self.scale = tk.Scale(self.window, from_=0, to=max(0, len(self.levels) - 1), orient="horizontal",
+                              length=400, showvalue=False, command=self.scrub)
+        self.scale.pack(side="left", fill="x", expand=True, padx=5)
+        self.time_label = tk.Label(self.window, width=16)
+        self.time_label.pack(side="left", padx=5)
+        self.show(0)
+
+    def show(self, frame):
+        levels = self.levels[frame]
+        if self.shown is None:
+            changed = range(len(levels))
+        else:
+            changed = np.flatnonzero(levels != self.shown)
+        for i in changed:
+            self.canvas.itemconfigure(self.items[i], fill=self.palette[levels[i]])
+        self.shown = levels
+        self.frame = frame
+        self.time_label.configure(text=f"{frame * self.tick_s:.2f} / {(len(self.levels) - 1) * self.tick_s:.2f} s")
+        self.scrubbing = True  # Moving the scale calls scrub(), which must not pause
+        self.scale.set(frame)
+        self.scrubbing = False
+
+    def toggle_play(self):
+        if self.playing:
+            self.pause()
+            return
+        if self.frame >= len(self.levels) - 1:
+            self.frame = 0
+        self.playing = True
+        self.play_button.configure(text="Pause")
+        self.started = time.monotonic() - self.frame * self.tick_s
+        self.advance()
+
+    def pause(self):
+        self.playing = False
+        self.play_button.configure(text="Play")
+        if self.pending is not None:
+            self.window.after_cancel(self.pending)
+            self.pending = None
+
+    def advance(self):
+        # Pick the frame from the wall clock so playback keeps real time however slow Tk is
+        frame = int((time.monotonic() - self.started) / self.tick_s)
+        if frame >= len(self.levels) - 1:
+            self.show(len(self.levels) - 1)
+            self.pause()
+            return
+        self.show(frame)
+        self.pending = self.window.after(REFRESH_MS, self.advance)
+
+    def scrub(self, value):
+        if self.scrubbing:
+            return
+        self.pause()
+        self.show(int(float(value)))
+
+    def close(self):
+        self.pause()
+        for item, fill in zip(self.items, self.saved_fills):
+            self.canvas.itemconfigure(item, fill=fill)
+        self.window.destroy()
@@ -0,0 +1,120 @@
+"""
+Emulated I2C bus shared by every machine.I2C object.
+
+Devices are attached by 7 bit address. Every transaction is recorded with a
+timestamp so bus utilisation and frame timing can be measured on the host.
+"""
+import errno
+import time
+
+ALLCALL_ADDRESS = 0x70  # PCA9685 default LED All Call address
+
+_start_us = time.monotonic_ns() // 1000
+
+
+def now_us():
+    """Microseconds since the emulator was loaded"""
+    return time.monotonic_ns() // 1000 - _start_us
+
+
+class Transaction:
+    """One I2C transfer as seen on the wire"""
+
+    __slots__ = ("t_us", "op", "address", "register", "data")
+
+    def __init__(self, t_us, op, address, register, data):
+        self.t_us = t_us
+        self.op = op
+        self.address = address
+        self.register = register
+        self.data = data
+
+    @property
+    def wire_bytes(self):
+        """Bytes clocked on the bus: address + register + data, plus the repeated start address of a read"""
+        return len(self.data) + (3 if self.op == "r" else 2)
+
+    def wire_time_us(self, freq):
+        """Time the transfer holds the bus at ``freq`` Hz, 9 clocks per byte"""
+        return self.wire_bytes * 9 * 1000000 / freq
+
+    def __repr__(self):
+        return "{:>10} {} 0x{:02x} reg 0x{:02x} {}".format(
+            self.t_us, self.op, self.address, self.register, bytes(self.data).hex()
+        )
+
+
+class I2CBus:
+    """
+    The wire: attached devices and the transaction log.
+
+    Devices need ``read(register, nbytes) -> bytes`` and ``write(register, data)`` methods.
+    Writes to `ALLCALL_ADDRESS` reach every device whose ``allcall`` property is true.
+    """
+
+    def __init__(self):
+        self.devices = {}
+        self.log = []
+        self.freq = 100000
+        self.realtime = False
+        """Block for the emulated wire time of each transfer, like a real blocking write"""
+
+    def attach(self, address, device):
+        self.devices[address] = device
+        return device
+
+    def _targets(self, address):
+        if address in self.devices:
+            return [self.devices[address]]
+        if address == ALLCALL_ADDRESS:
+            targets = [d for d in self.devices.values() if getattr(d, "allcall", False)]
+            if targets:
+                return targets
+        raise OSError(errno.ENODEV, "ENODEV")
+
+    def _record(self, op, address, register, data):
+        transaction = Transaction(now_us(), op, address, register, data)
+        self.log.append(transaction)
+        if self.realtime:
+            time.sleep(transaction.wire_time_us(self.freq) / 1000000)
+        return transaction
+
+    def scan(self):
+        return sorted(self.devices)
+
+    def read(self, address, register, nbytes):
+        device = self._targets(address)[0]
+        data = device.read(register, nbytes)
+        self._record("r", address, register, data)
+        return data
+
+    def write(self, address, register, data):
+        data = bytes(data)
+        for device in self._targets(address):
+            device.write(register, data)
+        self._record("w", address, register, data)
+
+    def clear(self):
+        del self.log[:]
+
+    def summary(self):
+        """Totals over the transaction log, per device address"""
+        per_address = {}
+        for t in self.log:
+            entry = per_address.setdefault(t.address, [0, 0, 0.0])
+            entry[0] += 1
+            entry[1] += t.wire_bytes
+            entry[2] += t.wire_time_us(self.freq)
+        elapsed = (self.log[-1].t_us - self.log[0].t_us) if len(self.log) > 1 else 0
+        busy = sum(entry[2] for entry in per_address.values())
+        return {
+            "transactions": len(self.log),
+            "bytes": sum(entry[1] for entry in per_address.values()),
+            "elapsed_us": elapsed,
+            "utilisation": busy / elapsed if elapsed else 0.0,
+            "per_address": per_address,
+        }
+
+
+bus = I2CBus()
+"""The default bus, what machine.I2C talks to"""
@@ -0,0 +1,123 @@
+"""
+CPython stand-in for MicroPython's ``machine`` module on the RP2040.
+
+machine.I2C talks to the shared emulated bus in i2cbus, which has PCA9685 models
+at 0x40-0x43 like the lightningbug board. deepsleep() and reset() end the run by
+raising, since on the device they reboot.
+"""
+from i2cbus import bus, now_us
+from pca9685_model import PCA9685Model
+
+PCA9685_ADDRESSES = (0x40, 0x41, 0x42, 0x43)
+
+pca_modules = [bus.attach(address, PCA9685Model(address)) for address in PCA9685_ADDRESSES]
+"""The emulated PCA9685 chips, in address order"""
+
+adc_values = {}
+"""Raw read_u16() value per ADC pin, e.g. adc_values[29] = 0 for darkness"""
+
+pin_log = []
+"""(t_us, pin id, value) for every output pin change"""
+
+
+class DeepSleep(Exception):
+    """Raised by deepsleep(), the device would reboot after ``ms``"""
+
+    def __init__(self, ms):
+        super().__init__(ms)
+        self.ms = ms
+
+
+class Reset(Exception):
+    """Raised by reset()"""
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    PULL_UP = 1
+    PULL_DOWN = 2
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self.mode = mode
+        self._value = 0
+        if value is not None:
+            self.value(value)
+
+    def value(self, value=None):
+        if value is None:
+            return self._value
+        self._value = 1 if value else 0
+        pin_log.append((now_us(), self.id, self._value))
+
+    def __call__(self, value=None):
+        return self.value(value)
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+    high = on
+    low = off
+
+    def init(self, mode=-1, pull=-1, value=None):
+        self.mode = mode
+        if value is not None:
+            self.value(value)
+
+
+class ADC:
+    def __init__(self, pin):
+        self.id = pin.id if isinstance(pin, Pin) else pin
+
+    def read_u16(self):
+        return adc_values.get(self.id, 0)
+
+
+class I2C:
+    """Bus master for the emulated bus, same methods the drivers use"""
+
+    def __init__(self, id=0, *, scl=None, sda=None, freq=400000, timeout=50000):
+        self.id = id
+        self.freq = freq
+        bus.freq = freq
+
+    def scan(self):
+        return bus.scan()
+
+    def readfrom_mem(self, addr, memaddr, nbytes, *, addrsize=8):
+        return bus.read(addr, memaddr, nbytes)
+
+    def readfrom_mem_into(self, addr, memaddr, buf, *, addrsize=8):
+        data = bus.read(addr, memaddr, len(buf))
+        for i in range(len(buf)):
+            buf[i] = data[i]
+
+    def writeto_mem(self, addr, memaddr, buf, *, addrsize=8):
+        bus.write(addr, memaddr, buf)
+
+
+def deepsleep(ms=0):
+    raise DeepSleep(ms)
+
+
+def lightsleep(ms=0):
+    import time
+
+    time.sleep(ms / 1000)
+
+
+def reset():
+    raise Reset()
+
+
+def freq(hz=None):
+    return 125000000
+
+
+def unique_id():
+    return b"\xe6\x61\x41\x04\x03\x00\x00\x00"
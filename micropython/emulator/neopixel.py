@@ -0,0 +1,34 @@
+"""
+CPython stand-in for MicroPython's ``neopixel``.
+
+Pixels live in a list of tuples; write() records the frame in ``frames``.
+"""
+from i2cbus import now_us
+
+frames = []
+"""(t_us, pin id, list of pixel tuples) for every write()"""
+
+
+class NeoPixel:
+    ORDER = (1, 0, 2, 3)
+
+    def __init__(self, pin, n, bpp=3, timing=1):
+        self.pin = pin
+        self.n = n
+        self.bpp = bpp
+        self.pixels = [(0,) * bpp] * n
+
+    def __len__(self):
+        return self.n
+
+    def __setitem__(self, index, value):
+        self.pixels[index] = tuple(value)
+
+    def __getitem__(self, index):
+        return self.pixels[index]
+
+    def fill(self, value):
+        self.pixels = [tuple(value)] * self.n
+
+    def write(self):
+        frames.append((now_us(), getattr(self.pin, "id", self.pin), list(self.pixels)))
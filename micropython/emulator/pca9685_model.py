@@ -0,0 +1,106 @@
+"""
+Register model of the NXP PCA9685 16 channel PWM controller.
+
+Follows the datasheet register map and power-on defaults: MODE1 auto-increment,
+PRE_SCALE only writable while asleep, write-only ALL_LED_ON/OFF registers that fan
+out to every channel, and the LED All Call address enabled by MODE1 bit 0.
+"""
+
+MODE1 = 0x00
+MODE2 = 0x01
+SUBADR1 = 0x02
+ALLCALLADR = 0x05
+LED0_ON_L = 0x06
+LED15_OFF_H = 0x45
+ALL_LED_ON_L = 0xFA
+ALL_LED_OFF_H = 0xFD
+PRE_SCALE = 0xFE
+
+MODE1_RESTART = 0x80
+MODE1_AI = 0x20
+MODE1_SLEEP = 0x10
+MODE1_ALLCALL = 0x01
+
+
+class PCA9685Model:
+    """One PCA9685 chip on the emulated bus"""
+
+    def __init__(self, address=0x40, oscillator=25000000):
+        self.address = address
+        self.oscillator = oscillator
+        self.power_on()
+
+    def power_on(self):
+        """Load the power-on register defaults"""
+        regs = bytearray(256)
+        regs[MODE1] = MODE1_SLEEP | MODE1_ALLCALL
+        regs[MODE2] = 0x04
+        regs[SUBADR1] = 0xE2
+        regs[SUBADR1 + 1] = 0xE4
+        regs[SUBADR1 + 2] = 0xE8
+        regs[ALLCALLADR] = 0xE0
+        for ch in range(16):
+            regs[LED0_ON_L + 4 * ch + 3] = 0x10  # LEDn_OFF_H full off
+        regs[PRE_SCALE] = 0x1E
+        self.regs = regs
+
+    @property
+    def allcall(self):
+        return bool(self.regs[MODE1] & MODE1_ALLCALL)
+
+    def _next(self, register):
+        if not self.regs[MODE1] & MODE1_AI:
+            return register
+        if register == LED15_OFF_H:
+            return MODE1  # The LED block rolls over to MODE1
+        return (register + 1) & 0xFF
+
+    def read(self, register, nbytes):
+        out = bytearray(nbytes)
+        for i in range(nbytes):
+            if ALL_LED_ON_L <= register <= ALL_LED_OFF_H:
+                out[i] = 0  # Write only, reads back as 0
+            else:
+                out[i] = self.regs[register]
+            register = self._next(register)
+        return bytes(out)
+
+    def write(self, register, data):
+        for value in data:
+            self._write_byte(register, value)
+            register = self._next(register)
+
+    def _write_byte(self, register, value):
+        regs = self.regs
+        if register == MODE1:
+            # Writing 1 to RESTART clears it, it never reads back as set here
+            regs[MODE1] = value & ~MODE1_RESTART
+        elif register == PRE_SCALE:
+            if regs[MODE1] & MODE1_SLEEP:
+                regs[PRE_SCALE] = max(3, value)
+        elif ALL_LED_ON_L <= register <= ALL_LED_OFF_H:
+            offset = register - ALL_LED_ON_L
+            for ch in range(16):
+                regs[LED0_ON_L + 4 * ch + offset] = value
+        else:
+            regs[register] = value
+
+    @property
+    def frequency(self):
+        """PWM frequency in Hz set by PRE_SCALE"""
+        return self.oscillator / 4096 / (self.regs[PRE_SCALE] + 1)
+
+    def duty(self, ch):
+        """Fraction of the PWM period channel ``ch`` is on, 0.0 to 1.0"""
+        base = LED0_ON_L + 4 * ch
+        regs = self.regs
+        on = regs[base] | (regs[base + 1] << 8)
+        off = regs[base + 2] | (regs[base + 3] << 8)
+        if off & 0x1000:
+            return 0.0
+        if on & 0x1000:
+            return 1.0
+        return ((off - on) & 0xFFF) / 4096
+
+    def duties(self):
+        return [self.duty(ch) for ch in range(16)]
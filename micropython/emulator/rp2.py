@@ -0,0 +1,102 @@
+"""
+CPython stand-in for MicroPython's ``rp2`` PIO support.
+
+asm_pio() does not assemble anything, it just hands back the program function with
+its pull threshold. StateMachine.put() records the words it was given in ``puts``. It
+also models the TX FIFO back-pressure of the real thing: the state machine takes
+BIT_US per bit of its pull threshold to shift out each word, as the WS2812 program does
+at 800 kHz, and put() busy-waits until all but the last FIFO_DEPTH words, plus the one
+in the output shift register, are gone.
+
+DMA only models a channel feeding a state machine's TX FIFO: config(trigger=True)
+hands the words to the state machine at once, as ``puts`` with shift 0, and active()
+stays True until the last of them has entered the FIFO.
+"""
+from i2cbus import now_us
+
+FIFO_DEPTH = 4  # TX FIFO words, not joined
+BIT_US = 1.25  # Time the state machine takes per bit shifted out, 800 kHz
+PIO_TX_FIFO = (0x50200010, 0x50300010)  # TXF0 of PIO0 and PIO1
+
+puts = []
+"""(t_us, state machine id, list of words, shift) for every put() or DMA transfer"""
+_machines = {}  # State machine id -> StateMachine, to find the target of a DMA transfer
+
+
+class PIO:
+    OUT_LOW = 0
+    OUT_HIGH = 1
+    IN_LOW = 0
+    IN_HIGH = 1
+    SHIFT_LEFT = 0
+    SHIFT_RIGHT = 1
+    JOIN_NONE = 0
+    JOIN_TX = 1
+    JOIN_RX = 2
+
+
+def asm_pio(**kwargs):
+    def decorator(program):
+        program.pull_thresh = kwargs.get("pull_thresh", 32)
+        return program
+
+    return decorator
+
+
+class StateMachine:
+    def __init__(self, id, program=None, freq=-1, **kwargs):
+        self.id = id
+        self.program = program
+        self.freq = freq
+        self._active = 0
+        self._drained_at = 0  # now_us() when the last word put has been shifted out
+        self._word_us = BIT_US * getattr(program, "pull_thresh", 32)
+        _machines[id] = self
+
+    def init(self, program=None, freq=-1, **kwargs):
+        self.program = program
+        self.freq = freq
+        self._word_us = BIT_US * getattr(program, "pull_thresh", 32)
+
+    def active(self, value=None):
+        if value is None:
+            return self._active
+        self._active = 1 if value else 0
+
+    def _feed(self, words, shift):
+        # Queue words, returns now_us() once only the FIFO and the shift register hold any
+        start = now_us()
+        puts.append((start, self.id, words, shift))
+        self._drained_at = max(self._drained_at, start) + len(words) * self._word_us
+        return self._drained_at - (FIFO_DEPTH + 1) * self._word_us
+
+    def put(self, value, shift=0):
+        words = list(value) if hasattr(value, "__len__") else [value]
+        returns_at = self._feed(words, shift)
+        while now_us() < returns_at:
+            pass
+
+    def tx_fifo(self):
+        queued = -(-(self._drained_at - now_us()) // self._word_us) - 1  # Less the shift register
+        return max(0, min(FIFO_DEPTH, int(queued)))
+
+
+class DMA:
+    def __init__(self):
+        self._done_at = 0
+
+    def pack_ctrl(self, **kwargs):
+        return kwargs.get("treq_sel", 0x3F) << 15
+
+    def config(self, read=None, write=None, count=None, ctrl=None, trigger=False):
+        # Nothing is kept, only a triggered transfer is modelled
+        if trigger:
+            pio = 0 if write < PIO_TX_FIFO[1] else 1
+            sm = _machines[pio * 4 + (write - PIO_TX_FIFO[pio]) // 4]
+            self._done_at = sm._feed([read[i] for i in range(count)], 0)
+
+    def active(self, value=None):
+        return now_us() < self._done_at
+
+    def close(self):
+        pass
@@ -0,0 +1,103 @@
+"""
+Run the real led_sequencer code on the host against the emulated board.
+
+    python run_headless.py [--light RAW] [--seed N] [--files A_LED_sequence.json ...]
+                           [--log bus.csv] [--realtime-bus] [--memory] [--dual-core]
+                           [--diagnostics]
+
+Puts this directory ahead of led_sequencer on sys.path so ``machine``, ``utime``,
+``neopixel``, ``rp2``, ``ujson`` and ``uio`` resolve to the stand-ins, then runs
+runsequence.main() until it calls deepsleep(). Every I2C transaction is recorded
+with a timestamp; a summary is printed at the end and --log writes them all as CSV.
+--dual-core runs runsequence with DUAL_CORE on, the I2C worker then runs on a thread.
+--diagnostics turns on DIAGNOSTICS, for the timing, cache and animator stats.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+
+EMULATOR_DIR = os.path.dirname(os.path.abspath(__file__))
+SEQUENCER_DIR = os.path.normpath(os.path.join(EMULATOR_DIR, "..", "led_sequencer"))
+sys.path[:0] = [EMULATOR_DIR, SEQUENCER_DIR]
+
+import machine  # noqa: E402
+from i2cbus import bus  # noqa: E402
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--light", type=int, default=0, help="raw photoresistor ADC reading, 0-65535 (default dark)")
+    parser.add_argument("--seed", type=int, help="seed for the playlist shuffle and static picks")
+    parser.add_argument("--files", nargs="+", help="sequence files to offer main() (default: all in sequences/)")
+    parser.add_argument("--log", help="write every bus transaction to this CSV file")
+    parser.add_argument("--realtime-bus", action="store_true", help="block for the wire time of each transfer")
+    parser.add_argument("--memory", action="store_true", help="report the peak Python heap with tracemalloc")
+    parser.add_argument("--dual-core", action="store_true", help="flush the I2C frames from a worker thread")
+    parser.add_argument("--diagnostics", action="store_true", help="print runsequence's stats after the run")
+    return parser.parse_args(argv)
+
+
+def write_log(path):
+    with open(path, "w") as f:
+        f.write("t_us,op,address,register,nbytes,data\n")
+        for t in bus.log:
+            f.write(
+                "{},{},0x{:02x},0x{:02x},{},{}\n".format(
+                    t.t_us, t.op, t.address, t.register, len(t.data), bytes(t.data).hex()
+                )
+            )
+
+
+def print_summary():
+    summary = bus.summary()
+    print("I2C at {} kHz".format(bus.freq // 1000))
+    print("  transactions: {}".format(summary["transactions"]))
+    print("  bytes on the wire: {}".format(summary["bytes"]))
+    elapsed_s = summary["elapsed_us"] / 1000000
+    if elapsed_s:
+        print("  bytes/s: {:.0f}".format(summary["bytes"] / elapsed_s))
+        print("  bus utilisation: {:.1%}".format(summary["utilisation"]))
+    for address, (count, nbytes, busy_us) in sorted(summary["per_address"].items()):
+        print("  0x{:02x}: {} transactions, {} bytes, {:.0f} ms busy".format(address, count, nbytes, busy_us / 1000))
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.seed is not None:
+        random.seed(args.seed)
+    bus.realtime = args.realtime_bus
+    os.chdir(SEQUENCER_DIR)
+
+    import runsequence
+    from photoresistor import photoresistor
+
+    runsequence.DUAL_CORE = args.dual_core
+    runsequence.DIAGNOSTICS = args.diagnostics
+    machine.adc_values[runsequence.PHOTORESISTOR_PIN] = args.light
+    light = photoresistor(runsequence.PHOTORESISTOR_PIN)
+    pcaswitch = machine.Pin(runsequence.PCA_SWITCH_PIN, machine.Pin.OUT)
+    pcaswitch.on()  # PNP, turn off the PCA9685 modules
+    files = args.files or runsequence.binsequence.prefer_compiled(os.listdir(runsequence.SEQUENCE_DIR))
+
+    if args.memory:
+        import tracemalloc
+
+        tracemalloc.start()
+    try:
+        asyncio.run(runsequence.main(light, pcaswitch, files))
+    except machine.DeepSleep as e:
+        print("deepsleep({} ms)".format(e.ms))
+    if args.memory:
+        print("peak Python heap: {} bytes".format(tracemalloc.get_traced_memory()[1]))
+        tracemalloc.stop()
+
+    print_summary()
+    if args.log:
+        write_log(args.log)
+        print("wrote {} transactions to {}".format(len(bus.log), args.log))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+"""CPython stand-in for MicroPython's ``uio``"""
+from io import *  # noqa: F401,F403
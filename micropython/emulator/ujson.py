@@ -0,0 +1,2 @@
+"""CPython stand-in for MicroPython's ``ujson``"""
+from json import *  # noqa: F401,F403
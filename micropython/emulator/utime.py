@@ -0,0 +1,57 @@
+"""
+CPython stand-in for MicroPython's ``utime``.
+
+Tick counters wrap at 2**30 like on the RP2040, so code that forgets ticks_diff()
+breaks here the same way it would on the device.
+"""
+import time as _time
+
+_TICKS_PERIOD = 1 << 30
+_TICKS_MAX = _TICKS_PERIOD - 1
+_TICKS_HALFPERIOD = _TICKS_PERIOD // 2
+
+
+def sleep(seconds):
+    _time.sleep(seconds)
+
+
+def sleep_ms(ms):
+    _time.sleep(ms / 1000)
+
+
+def sleep_us(us):
+    _time.sleep(us / 1000000)
+
+
+def ticks_ms():
+    return (_time.monotonic_ns() // 1000000) & _TICKS_MAX
+
+
+def ticks_us():
+    return (_time.monotonic_ns() // 1000) & _TICKS_MAX
+
+
+def ticks_cpu():
+    return ticks_us()
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & _TICKS_MAX
+
+
+def ticks_diff(ticks1, ticks2):
+    diff = (ticks1 - ticks2) & _TICKS_MAX
+    return ((diff + _TICKS_HALFPERIOD) & _TICKS_MAX) - _TICKS_HALFPERIOD
+
+
+def time_ns():
+    return _time.time_ns()
+
+
+localtime = _time.localtime
+mktime = _time.mktime
+
+
+def time():
+    """Seconds since the epoch"""
+    return int(_time.time())
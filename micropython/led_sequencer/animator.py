@@ -0,0 +1,249 @@
+"""
+Single timeline animator for the firefly fades.
+
+Instead of one asyncio task per fading LED, every live envelope sits in a compact
+table indexed by (module, channel). One task advances all of them on a fixed tick,
+collects the new duty cycles per PCA9685 module and flushes each module's dirty
+channels with a single PCA9685.set_frame() call. CPU and I2C cost then scale with the
+tick rate, not with the number of fireflies on at once.
+
+The envelope has the same timing fade() used: sleeplen / tick up to the peak brightness,
+the same number of ticks back down, then off. The ramp itself comes from the
+precomputed, gamma corrected tables in envelope.py. ramp() plays the parametric ramps of
+a sequence through the same table: one way from the channel's current level to a new one,
+which it then holds.
+
+Ticks are scheduled against absolute utime.ticks_ms() deadlines, so I2C time and event
+loop latency do not stretch the fades. When the loop falls a whole tick or more behind,
+the missed ticks are advanced without being flushed (dropped frames) and counted.
+"""
+import asyncio
+from array import array
+import utime
+import envelope
+
+TICK_MS = 10  # Envelope step, same as the old fade() default of 0.01s
+CHANNELS_PER_MODULE = 16
+_ENVELOPE = 1  # Slot plays up and down, then off
+_TRANSITION = 2  # Slot plays one way, then holds its last level
+
+def percentage_to_duty_cycle(percentage):
+    return int((percentage / 100) * 0xFFFF)
+
+try:
+    sleep_ms = asyncio.sleep_ms
+except AttributeError:
+    # CPython asyncio, when running on the host
+    async def sleep_ms(ms):
+        await asyncio.sleep(ms / 1000)
+
+class Animator:
+    """
+    Drives the fade envelopes of every channel on a list of PCA9685 modules.
+
+    :param list pca: The PCA9685 modules, indexed by module number
+    :param int tick_ms: Length of one envelope step in milliseconds
+    :param allcall: Optional PCA9685AllCall broadcasting to all the modules, blackout() then
+        takes a single I2C transaction
+    :param worker: Optional i2cworker.I2CWorker writing the frames from the second core,
+        the modules it was given are then left to it
+    :param strings: pixelmodule.PixelString objects whose modules are in ``pca``, each is
+        shown once per tick after the flush
+    """
+    def __init__(self, pca, tick_ms=TICK_MS, allcall=None, worker=None, strings=()):
+        self.pca = pca
+        self.allcall = allcall
+        self.worker = worker
+        self.strings = strings
+        self.tick_ms = tick_ms
+        self._tick_s = tick_ms / 1000
+        slots = len(pca) * CHANNELS_PER_MODULE
+        # Envelope table, one slot per channel: ramp table and current tick
+        self._ramp = [None] * slots
+        self._pos = array("H", [0] * slots)
+        self._live = bytearray(slots)  # 0, _ENVELOPE or _TRANSITION
+        self._active = []  # Slots with a live envelope
+        # Pending duty cycles per module and a bitmask of channels to flush
+        self._frames = [array("H", [0] * CHANNELS_PER_MODULE) for _ in pca]
+        self._dirty = [0] * len(pca)
+        self._running = False
+        self.dropped_ticks = 0
+        """Ticks advanced without a flush because the loop fell behind"""
+        self.max_late_ms = 0
+        """Worst lateness of a tick against its deadline, in ms"""
+        self.bus_errors = 0
+        """Module flushes that failed with OSError and were retried on the next tick"""
+
+    @property
+    def active(self):
+        """Number of envelopes currently playing"""
+        return len(self._active)
+
+    @property
+    def fading(self):
+        """Number of fade envelopes (tails) still playing, ramps that end in a held level
+        are not counted"""
+        live = self._live
+        count = 0
+        for slot in self._active:
+            if live[slot] == _ENVELOPE:
+                count += 1
+        return count
+
+    def start(self, module, ch, brightness, sleeplen):
+        """Start a fade up to ``brightness`` percent and back down, ``sleeplen`` seconds each way.
+        Restarts the envelope if the channel is already fading."""
+        slot = module * CHANNELS_PER_MODULE + ch
+        self._ramp[slot] = envelope.get(envelope.lu_to_duty(brightness), int(sleeplen / self._tick_s))
+        self._pos[slot] = 0
+        if not self._live[slot]:
+            self._active.append(slot)
+        self._live[slot] = _ENVELOPE
+
+    def ramp(self, module, ch, brightness, sleeplen, curve=envelope.CURVE_GAMMA):
+        """Move a channel from its current level to ``brightness`` percent over ``sleeplen``
+        seconds and hold it there. Takes over from an envelope playing on the channel. With no
+        ``sleeplen`` the level is set right away, so a ramp started next moves on from it."""
+        slot = module * CHANNELS_PER_MODULE + ch
+        duty = envelope.lu_to_duty(brightness)
+        n = int(sleeplen / self._tick_s)
+        if n < 1:
+            self._frames[module][ch] = duty << 4
+            self._dirty[module] |= 1 << ch
+            if not self._live[slot]:
+                return
+            start = duty  # Still hand the slot over, so the envelope stops writing it
+        else:
+            start = self._frames[module][ch] >> 4
+        self._ramp[slot] = envelope.transition(start, duty, n, curve)
+        self._pos[slot] = 0
+        if not self._live[slot]:
+            self._active.append(slot)
+        self._live[slot] = _TRANSITION
+
+    def set_level(self, module, ch, brightness):
+        """Set a channel to ``brightness`` percent on the next tick. Like a direct duty_cycle
+        write, an envelope still playing on the channel takes over again afterwards."""
+        self._frames[module][ch] = percentage_to_duty_cycle(brightness)
+        self._dirty[module] |= 1 << ch
+
+    def blackout(self):
+        """Stop every envelope and switch all channels off right away"""
+        for slot in self._active:
+            self._live[slot] = 0
+        self._active = []
+        worker = self.worker
+        if worker is not None:
+            worker.clear()  # Queued frames would switch channels back on
+            worker.bus_lock.acquire()
+        try:
+            for module in range(len(self.pca)):
+                frame = self._frames[module]
+                for ch in range(CHANNELS_PER_MODULE):
+                    frame[ch] = 0
+                self._dirty[module] = 0
+                if self.allcall is None or self.pca[module] not in self.allcall.modules:
+                    self.pca[module].set_many(0, frame)
+            if self.allcall is not None:
+                self.allcall.set_all(0)
+        finally:
+            if worker is not None:
+                worker.bus_lock.release()
+        for string in self.strings:
+            string.show()
+
+    def _advance(self):
+        ramps = self._ramp
+        pos = self._pos
+        frames = self._frames
+        dirty = self._dirty
+        live = self._live
+        active = self._active
+        i = 0
+        while i < len(active):
+            slot = active[i]
+            ramp = ramps[slot]
+            n = len(ramp)
+            k = pos[slot]
+            if live[slot] == _TRANSITION:
+                duty = ramp[k]
+                end = n
+            else:
+                end = 2 * n
+                if k < n:
+                    duty = ramp[k]  # Fade up
+                elif k < 2 * n - 1:
+                    duty = ramp[2 * n - 2 - k]  # Fade down
+                else:
+                    duty = 0
+            module = slot // CHANNELS_PER_MODULE
+            ch = slot % CHANNELS_PER_MODULE
+            frames[module][ch] = duty << 4  # 12 bit table to the driver's 16 bit scale
+            dirty[module] |= 1 << ch
+            k += 1
+            if k >= end:
+                # Envelope finished, swap-remove it from the active list
+                live[slot] = 0
+                ramps[slot] = None
+                active[i] = active[-1]
+                active.pop()
+                continue
+            pos[slot] = k
+            i += 1
+
+    def _flush(self):
+        dirty = self._dirty
+        worker = self.worker
+        for module in range(len(dirty)):
+            if worker is not None and module < len(worker.pca):
+                dirty[module] |= worker.take_failed(module)  # Writes the worker couldn't make
+            mask = dirty[module]
+            if not mask:
+                continue
+            lo = 0
+            while not mask & (1 << lo):
+                lo += 1
+            hi = CHANNELS_PER_MODULE - 1
+            while not mask & (1 << hi):
+                hi -= 1
+            if worker is None or module >= len(worker.pca):
+                try:
+                    self.pca[module].set_frame(self._frames[module], lo, hi + 1 - lo)
+                except OSError:
+                    # A NACK or bus glitch, the channels stay dirty and go out again next tick
+                    self.bus_errors += 1
+                    continue
+            elif not worker.submit(module, self._frames[module], lo, hi + 1 - lo):
+                continue  # Ring full, the channels stay dirty until the next tick
+            dirty[module] = 0
+        for string in self.strings:
+            string.show()
+
+    def step(self):
+        """Advance every envelope by one tick and flush the changes to the modules"""
+        self._advance()
+        self._flush()
+
+    async def run(self):
+        """Tick on absolute deadlines until stop() is called"""
+        self._running = True
+        tick_ms = self.tick_ms
+        deadline = utime.ticks_ms()
+        while self._running:
+            self.step()
+            deadline = utime.ticks_add(deadline, tick_ms)
+            late = utime.ticks_diff(utime.ticks_ms(), deadline)
+            if late >= tick_ms:
+                # Behind by whole ticks: keep the envelopes on time, drop the frames
+                missed = late // tick_ms
+                for _ in range(missed):
+                    self._advance()
+                deadline = utime.ticks_add(deadline, missed * tick_ms)
+                self.dropped_ticks += missed
+                late -= missed * tick_ms
+            if late > self.max_late_ms:
+                self.max_late_ms = late
+            await sleep_ms(-late if late < 0 else 0)
+
+    def stop(self):
+        self._running = False
@@ -0,0 +1,79 @@
+"""
+Import time and wake energy benchmark for the two stage boot.
+
+Compares what a daytime wake costs when main.py is sentinel.py (machine and the
+photoresistor only) against importing all of runsequence. Each stage is imported
+cold REPEATS times, removing the modules it loaded from sys.modules in between, and
+the fastest run is kept. On MicroPython gc.mem_alloc() also gives the heap the
+imports took. On the host benchmark_util puts the emulator on the path, and only the
+repo's own modules, the sequencer's and the emulator's, are removed and counted, as
+CPython's standard library does not survive being imported twice:
+
+    python benchmark_boot.py
+
+The energy figures are estimates, awake time times WAKE_CURRENT_MA at SUPPLY_VOLTAGE.
+"""
+import gc
+import sys
+from benchmark_util import IS_MICROPYTHON, heap_used, ticks_us, ticks_diff
+
+if not IS_MICROPYTHON:
+    import os
+    from benchmark_util import EMULATOR_DIR
+
+    REPO_DIR = os.path.dirname(EMULATOR_DIR)  # micropython/, the sequencer and the emulator
+
+REPEATS = 5
+STAGES = ("sentinel", "runsequence")
+WAKE_CURRENT_MA = 25  # RP2040 running from flash at 125 MHz, board LEDs off
+SUPPLY_VOLTAGE = 3.3
+DAYLIGHT_HOURS = 12
+
+def own_module(name):
+    # True for modules a cold import on the board has to load again
+    if IS_MICROPYTHON:
+        return True
+    path = getattr(sys.modules[name], "__file__", None)
+    return path is not None and os.path.abspath(path).startswith(REPO_DIR + os.sep)
+
+def cold_import(name):
+    # Returns (us, heap bytes or None, modules loaded) for importing name from scratch
+    before = set(sys.modules)
+    gc.collect()
+    heap = heap_used()
+    start = ticks_us()
+    __import__(name)
+    elapsed = ticks_diff(ticks_us(), start)
+    if heap is not None:
+        heap = heap_used() - heap
+    loaded = [module for module in sys.modules if module not in before and own_module(module)]
+    for module in loaded:
+        del sys.modules[module]
+    return elapsed, heap, loaded
+
+def wake_energy_mj(us):
+    return us / 1000000 * WAKE_CURRENT_MA * SUPPLY_VOLTAGE
+
+def main():
+    results = {}
+    for name in STAGES:
+        best = None
+        for _ in range(REPEATS):
+            run = cold_import(name)
+            if best is None or run[0] < best[0]:
+                best = run
+        results[name] = best
+        us, heap, loaded = best
+        print("{}: {} us, {} modules{}".format(
+            name, us, len(loaded), "" if heap is None else ", {} bytes heap".format(heap)))
+        print("  " + " ".join(sorted(loaded)))
+
+    from boardconfig import LIGHT_DETECTION_SLEEP
+
+    wakes = DAYLIGHT_HOURS * 3600 // LIGHT_DETECTION_SLEEP
+    saved_us = results["runsequence"][0] - results["sentinel"][0]
+    print("Saved per daytime wake: {} us, {:.3f} mJ".format(saved_us, wake_energy_mj(saved_us)))
+    print("Saved per day ({} wakes): {:.1f} mJ".format(wakes, wakes * wake_energy_mj(saved_us)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Allocation benchmark for the PCA9685 duty cycle write paths.
+
+Runs on the board or on CPython (python benchmark_i2c_alloc.py) with a fake I2C bus,
+no PCA9685 needed. It writes a ramp of duty cycles through each path the sequencer and
+the driver have: PWMChannel.duty_cycle, set_frame() as the animator flushes, and the
+pwm_regs struct array descriptor, with and without the register cache. The fake bus
+keeps every buffer it is handed alive without allocating itself once it has seen them,
+so benchmark_util.allocated() sees a per write buffer or memoryview on CPython as well
+as on the board.
+"""
+from array import array
+from benchmark_util import allocated, timed
+from micropython_pca9685 import PCA9685
+
+WRITES = 1000
+CHANNEL = 3
+PATHS = ("duty_cycle", "set_frame", "pwm_regs")
+
+class FakeI2C:
+    """Register file for one or more I2C devices that keeps every buffer it was given"""
+    def __init__(self):
+        self.memory = {}
+        self.buffers = []
+        self.transactions = 0
+
+    def _keep(self, buf):
+        # By identity, id() would allocate a big int for RAM addresses on the board
+        for kept in self.buffers:
+            if kept is buf:
+                return
+        self.buffers.append(buf)
+
+    def readfrom_mem(self, address, register, nbytes):
+        mem = self.memory.setdefault(address, bytearray(256))
+        self.transactions += 1
+        return bytes(mem[register:register + nbytes])
+
+    def readfrom_mem_into(self, address, register, buf):
+        mem = self.memory.setdefault(address, bytearray(256))
+        self.transactions += 1
+        self._keep(buf)
+        for i in range(len(buf)):
+            buf[i] = mem[register + i]
+
+    def writeto_mem(self, address, register, buf):
+        mem = self.memory.setdefault(address, bytearray(256))
+        self.transactions += 1
+        self._keep(buf)
+        for i in range(len(buf)):
+            mem[register + i] = buf[i]
+
+def run(path, cache):
+    i2c = FakeI2C()
+    pca = PCA9685(i2c, cache=cache)
+    pca.frequency = 2047
+    channel = pca.channels[CHANNEL]
+    frame = array("H", [0] * 16)
+    # Ramp values like a fade, each one different from the last so every write hits the bus
+    values = [0x0100 + (i * 16) % 0xF000 for i in range(WRITES)]
+    pairs = [(0, value >> 4) for value in values]
+
+    def write_duty_cycle():
+        for value in values:
+            channel.duty_cycle = value
+
+    def write_set_frame():
+        for value in values:
+            frame[CHANNEL] = value
+            pca.set_frame(frame, CHANNEL, 1)
+
+    def write_pwm_regs():
+        regs = pca.pwm_regs
+        for pair in pairs:
+            regs[CHANNEL] = pair
+
+    writes = {"duty_cycle": write_duty_cycle, "set_frame": write_set_frame, "pwm_regs": write_pwm_regs}[path]
+    # Warm up so lazily created objects (channel objects, buffers, views) exist before counting
+    writes()
+    transactions_before = i2c.transactions
+    elapsed = timed(writes)
+    transactions = i2c.transactions - transactions_before
+    heap = allocated(writes, exclude=(__file__,))
+
+    print(f"{path}, cache={cache}")
+    print(f"  bus transactions:        {transactions} for {WRITES} writes")
+    print(f"  heap bytes per write:    {heap / WRITES}")
+    print(f"  time per write:          {elapsed / WRITES:.2f} us")
+    return heap
+
+def main():
+    allocating = []
+    for path in PATHS:
+        for cache in (False, True):
+            if run(path, cache):
+                allocating.append(f"{path} (cache={cache})")
+    if allocating:
+        print("FAIL: steady state writes allocate through " + ", ".join(allocating))
+    else:
+        print("OK: zero allocations per steady state duty cycle write")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Helpers shared by the benchmark_*.py scripts.
+
+The benchmarks run on the board or on CPython, where this puts the emulator's stand-ins
+for machine, utime and rp2 on the path. allocated() runs a piece of code once and
+returns the heap bytes it allocated. On MicroPython the garbage collector is disabled
+for the run and gc.mem_alloc() counts every byte, freed or not. CPython frees short
+lived objects straight away, so there tracemalloc counts the bytes allocated during the
+run and still alive after it, leaving out what the emulator and the files passed as
+``exclude``, like the benchmark's own test doubles, allocate themselves. Keep the
+buffers the code under test hands out alive, as the benchmarks' fake bus does, and a
+per call allocation shows up either way.
+"""
+import gc
+import sys
+
+IS_MICROPYTHON = sys.implementation.name == "micropython"
+if not IS_MICROPYTHON:
+    import os
+    import tracemalloc
+
+    EMULATOR_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "emulator"))
+    if EMULATOR_DIR not in sys.path:
+        sys.path.insert(0, EMULATOR_DIR)
+
+from utime import ticks_us, ticks_diff
+
+def heap_used():
+    # Heap bytes in use, None on CPython
+    if IS_MICROPYTHON:
+        return gc.mem_alloc()
+    return None
+
+def timed(function):
+    # Microseconds function() took
+    start = ticks_us()
+    function()
+    return ticks_diff(ticks_us(), start)
+
+def allocated(function, exclude=()):
+    # Heap bytes function() allocated, on CPython leaving out what the files in exclude allocate
+    gc.collect()
+    if IS_MICROPYTHON:
+        gc.disable()
+        before = gc.mem_alloc()
+        function()
+        after = gc.mem_alloc()
+        gc.enable()
+        return after - before
+    tracemalloc.start()
+    function()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    filters = [
+        tracemalloc.Filter(False, os.path.join(EMULATOR_DIR, "*")),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ]
+    filters += [tracemalloc.Filter(False, os.path.abspath(path)) for path in exclude]
+    snapshot = snapshot.filter_traces(filters)
+    return sum(stat.size for stat in snapshot.statistics("filename"))
@@ -0,0 +1,82 @@
+"""
+Time and allocation benchmark for WS2812.pixels_show().
+
+Runs on the board (XIAO RP2040 RGB LED pin) or on CPython against the emulator's rp2
+and machine stand-ins (python benchmark_ws2812.py). For 1, 60 and 300 pixels it times
+show() after the previous frame has latched, so the latch wait is not counted. With a
+DMA channel feeding the PIO that leaves the dimming loop; without one (firmware before
+rp2.DMA, or NO_DMA below) put() blocks about 30 us per pixel beyond the 4 byte FIFO,
+and the emulator's StateMachine models that back-pressure too. The heap bytes per show
+come from benchmark_util.allocated(), with every buffer handed to the state machine or
+the DMA kept alive on the host so a per show buffer is counted there too.
+"""
+from benchmark_util import IS_MICROPYTHON, allocated, ticks_us, ticks_diff
+from ws2812 import WS2812
+
+PIN = 12  # XIAO RP2040 RGB LED
+PIXEL_COUNTS = (1, 60, 300)
+SHOWS = 100
+NO_DMA = False  # Feed the PIO with put(), to compare
+
+def run(led_count):
+    led = WS2812(PIN, led_count, brightness=0.2)
+    if NO_DMA:
+        led._feeder = None
+    for i in range(led_count):
+        led.pixels_set(i, led.wheel(i * 256 // led_count))
+    buffers = []
+    if not IS_MICROPYTHON:
+        put = led.sm.put
+
+        def keep(value, shift=0):
+            if not any(kept is value for kept in buffers):
+                buffers.append(value)
+            put(value, shift)
+
+        led.sm.put = keep
+        if led._feeder is not None:
+            dma = led._feeder[0]
+            config = dma.config
+
+            def keep_read(read=None, write=None, count=None, ctrl=None, trigger=False):
+                if not any(kept is read for kept in buffers):
+                    buffers.append(read)
+                config(read=read, write=write, count=count, ctrl=ctrl, trigger=trigger)
+
+            dma.config = keep_read
+
+    def shows():
+        for _ in range(SHOWS):
+            while not led.ready():
+                pass
+            led.pixels_show()
+
+    led.pixels_show()  # Warm up
+    elapsed = 0
+    for _ in range(SHOWS):
+        while not led.ready():
+            pass
+        start = ticks_us()
+        led.pixels_show()
+        elapsed += ticks_diff(ticks_us(), start)
+    heap = allocated(shows, exclude=(__file__,))
+
+    print(f"{led_count} pixels")
+    print(f"  time per show:           {elapsed / SHOWS:.0f} us")
+    print(f"  heap bytes per show:     {heap / SHOWS}")
+    return heap
+
+def main():
+    allocated_bytes = 0
+    for led_count in PIXEL_COUNTS:
+        allocated_bytes += run(led_count)
+    led = WS2812(PIN, PIXEL_COUNTS[0])
+    led.pixels_fill((0, 0, 0))
+    led.pixels_show()
+    if allocated_bytes:
+        print("FAIL: pixels_show() allocates")
+    else:
+        print("OK: zero allocations per pixels_show()")
+
+if __name__ == "__main__":
+    main()
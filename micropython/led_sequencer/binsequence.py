@@ -0,0 +1,267 @@
+"""
+Compact binary sequence format.
+
+A compiled sequence is an 8 byte header followed by one 8 byte record per step,
+all little endian:
+
+    header: magic b"LBSQ", version (u8), reserved (u8), record count (u16)
+    record: op << 4 | module index (u8), curve << 4 | channel (u8),
+            duty 0-4095 (u16), sleep ms (u16), wait ms (u16)
+
+so only modules "a" to "p" fit. Sequences using the pixel modules past those stay JSON.
+
+Besides the plain fade step, version 2 adds parametric ops so a throb or a breathing
+pattern is a handful of records instead of one per level:
+
+    OP_LEVEL   set the channel to duty, hold it for sleep ms, then wait
+    OP_RAMP    move the channel from its current level to duty over sleep ms along
+               the curve (envelope.CURVES), hold it, then wait
+    OP_REPEAT  play the next ``sleep`` records ``duty`` times, they may hold repeats too
+
+In the designer's JSON a ramp is a node with "op": "ramp", the target level in "lu",
+the ramp time in "s", an optional start level in "from" and an optional "curve"
+(default "gamma"). A repeat is {"op": "repeat", "n": times, "len": nodes}, covering
+the ``len`` nodes after it. node_steps() and record_steps() turn either form into the
+same stream of steps, with the repeats played out.
+
+Compile the designer's JSON on the host with CPython:
+
+    python binsequence.py sequences/*.json
+
+which writes A_LED_sequence.bin next to A_LED_sequence.json. On the board
+SequenceReader streams the records from flash into one reused buffer, so a
+sequence never has to fit in RAM. Sequences that replay over and over can instead
+be read once with read_sequence() and iterated from RAM with records().
+"""
+import struct
+from envelope import MAX_DUTY, CURVES, CURVE_GAMMA, lu_to_duty
+
+MAGIC = b"LBSQ"
+VERSION = 2
+VERSIONS = (1, 2)  # Versions the reader accepts, version 1 only has plain steps
+EXTENSION = ".bin"
+HEADER_FORMAT = "<4sBBH"
+RECORD_FORMAT = "<BBHHH"
+HEADER_SIZE = 8
+RECORD_SIZE = 8
+RECORDS_PER_READ = 32  # Records pulled from flash per readinto()
+OP_STEP = 0  # Fade envelope, or a level hold when repeating the last channel
+OP_LEVEL = 1
+OP_RAMP = 2
+OP_REPEAT = 3
+MAX_NIBBLE = 15  # Largest module index and channel a record can hold
+
+def compiled_name(file_name):
+    """Name of the compiled twin of a JSON sequence file"""
+    if file_name.endswith(".json"):
+        return file_name[:-5] + EXTENSION
+    return file_name
+
+def prefer_compiled(file_names):
+    """Drop JSON sequences that also have a compiled twin in the listing"""
+    names = set(file_names)
+    return [f for f in file_names if not (f.endswith(".json") and compiled_name(f) in names)]
+
+def duty_to_lu(duty):
+    """12 bit duty cycle back to brightness in percent"""
+    return duty * 100 / MAX_DUTY
+
+def seconds_to_ms(seconds):
+    return max(0, min(0xFFFF, int(seconds * 1000 + 0.5)))
+
+def _encode(nodes, start, end, out):
+    # Append the records of nodes[start:end] to ``out``, returns how many were added
+    first = len(out)
+    i = start
+    while i < end:
+        node = nodes[i]
+        op = node.get("op")
+        if op == "repeat":
+            body_end = i + 1 + node["len"]
+            if body_end > end:
+                raise ValueError("Repeat at node {} runs past its block".format(i))
+            at = len(out)
+            out.append(None)
+            count = _encode(nodes, i + 1, body_end, out)
+            out[at] = (OP_REPEAT << 4, 0, node["n"], count, 0)
+            i = body_end
+            continue
+        module = ord(node["m"]) - ord("a")
+        ch = node["ch"]
+        # Both share a byte with another field, a larger value would change the op or curve
+        if not 0 <= module <= MAX_NIBBLE:
+            raise ValueError("Module '{}' at node {} is past 'p', keep the sequence as JSON".format(node["m"], i))
+        if not 0 <= ch <= MAX_NIBBLE:
+            raise ValueError("Channel {} at node {} is out of range 0..{}".format(ch, i, MAX_NIBBLE))
+        if op == "ramp":
+            if "from" in node:
+                out.append((OP_LEVEL << 4 | module, ch, lu_to_duty(node["from"]), 0, 0))
+            curve = CURVES.index(node.get("curve", CURVES[CURVE_GAMMA]))
+            out.append((OP_RAMP << 4 | module, curve << 4 | ch, lu_to_duty(node["lu"]),
+                        seconds_to_ms(node["s"]), seconds_to_ms(node["w"])))
+        elif op is None:
+            out.append((module, ch, lu_to_duty(node["lu"]),
+                        seconds_to_ms(node["s"]), seconds_to_ms(node["w"])))
+        else:
+            raise ValueError("Unknown op '{}' at node {}".format(op, i))
+        i += 1
+    return len(out) - first
+
+def compile_sequence(json_data):
+    """Encode a list of designer nodes ({'m', 'ch', 'lu', 's', 'w', ...}) as bytes"""
+    records = []
+    _encode(json_data, 0, len(json_data), records)
+    out = bytearray(HEADER_SIZE + RECORD_SIZE * len(records))
+    struct.pack_into(HEADER_FORMAT, out, 0, MAGIC, VERSION, 0, len(records))
+    offset = HEADER_SIZE
+    for record in records:
+        struct.pack_into(RECORD_FORMAT, out, offset, *record)
+        offset += RECORD_SIZE
+    return bytes(out)
+
+def compile_file(json_path, bin_path=None):
+    """Compile a JSON sequence file, returns the path written"""
+    import json
+
+    if bin_path is None:
+        bin_path = compiled_name(json_path)
+    with open(json_path, "r") as f:
+        json_data = json.load(f)
+    data = compile_sequence(json_data)  # Before opening, a failed compile leaves no .bin behind
+    with open(bin_path, "wb") as f:
+        f.write(data)
+    return bin_path
+
+def check_header(header, path):
+    """Raise ValueError unless ``header`` starts a compiled sequence, returns the record count"""
+    if len(header) < HEADER_SIZE or header[:4] != MAGIC:
+        raise ValueError("Not a compiled sequence: {}".format(path))
+    if header[4] not in VERSIONS:
+        raise ValueError("Unsupported sequence version {} in {}".format(header[4], path))
+    return header[6] | (header[7] << 8)
+
+def read_sequence(path):
+    """Read a whole compiled sequence into RAM, returns a memoryview of its records"""
+    with open(path, "rb") as f:
+        data = f.read()
+    check_header(data, path)
+    return memoryview(data)[HEADER_SIZE:]
+
+def records(data):
+    """Iterate the raw (op | module, curve | channel, duty, sleep_ms, wait_ms) records returned by read_sequence()"""
+    for o in range(0, len(data) - RECORD_SIZE + 1, RECORD_SIZE):
+        yield (
+            data[o],
+            data[o + 1],
+            data[o + 2] | (data[o + 3] << 8),
+            data[o + 4] | (data[o + 5] << 8),
+            data[o + 6] | (data[o + 7] << 8),
+        )
+
+def expand(records):
+    """Play out the OP_REPEAT records of a record iterator, yields the other records"""
+    for record in records:
+        if record[0] >> 4 == OP_REPEAT:
+            body = [next(records) for _ in range(record[3])]
+            for _ in range(record[2]):
+                yield from expand(iter(body))
+        else:
+            yield record
+
+def record_steps(records):
+    """(op, module, channel, lu, sleep s, wait s, curve) per step of a record iterator"""
+    for module, ch, duty, sleep_ms, wait_ms in expand(records):
+        yield module >> 4, module & 0x0F, ch & 0x0F, duty_to_lu(duty), sleep_ms / 1000, wait_ms / 1000, ch >> 4
+
+def node_steps(nodes, start=0, end=None):
+    """(op, module, channel, lu, sleep s, wait s, curve) per step of the designer's JSON nodes"""
+    if end is None:
+        end = len(nodes)
+    i = start
+    while i < end:
+        node = nodes[i]
+        op = node.get("op")
+        if op == "repeat":
+            body_end = i + 1 + node["len"]
+            for _ in range(node["n"]):
+                yield from node_steps(nodes, i + 1, body_end)
+            i = body_end
+            continue
+        module = ord(node["m"]) - ord("a")
+        if op == "ramp":
+            if "from" in node:
+                yield OP_LEVEL, module, node["ch"], node["from"], 0, 0, CURVE_GAMMA
+            curve = CURVES.index(node.get("curve", CURVES[CURVE_GAMMA]))
+            yield OP_RAMP, module, node["ch"], node["lu"], node["s"], node["w"], curve
+        else:
+            yield OP_STEP, module, node["ch"], node["lu"], node["s"], node["w"], CURVE_GAMMA
+        i += 1
+
+class SequenceReader:
+    """
+    Streams the records of a compiled sequence file.
+
+    Iterating yields raw (op | module, curve | channel, duty, sleep_ms, wait_ms) tuples, as
+    records() does. Records are read
+    RECORDS_PER_READ at a time into a buffer that is reused for the whole file.
+
+    :param str path: The compiled sequence file
+    """
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._buffer = bytearray(RECORD_SIZE * RECORDS_PER_READ)
+        self._offset = 0
+        self._end = 0
+        try:
+            count = check_header(self._file.read(HEADER_SIZE), path)
+        except ValueError:
+            self.close()
+            raise
+        self.count = count
+        """Number of records in the file"""
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._offset >= self._end:
+            n = self._file.readinto(self._buffer)
+            if not n:
+                raise StopIteration
+            self._offset = 0
+            self._end = n - n % RECORD_SIZE
+            if not self._end:
+                raise StopIteration
+        buf = self._buffer
+        o = self._offset
+        self._offset = o + RECORD_SIZE
+        return (
+            buf[o],
+            buf[o + 1],
+            buf[o + 2] | (buf[o + 3] << 8),
+            buf[o + 4] | (buf[o + 5] << 8),
+            buf[o + 6] | (buf[o + 7] << 8),
+        )
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.close()
+
+def main(paths):
+    for path in paths:
+        try:
+            bin_path = compile_file(path)
+        except ValueError as e:
+            print("{}: not compiled, {}".format(path, e))
+            continue
+        print("{} -> {}".format(path, bin_path))
+
+if __name__ == "__main__":
+    import sys
+
+    main(sys.argv[1:])
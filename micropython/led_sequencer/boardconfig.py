@@ -0,0 +1,13 @@
+"""
+Pins and light sensing settings shared by both boot stages.
+
+sentinel.py runs as main.py on the board and runsequence.py is imported after it, so
+the settings live here rather than in either of them. Copy this file to the board with
+the others.
+"""
+PHOTORESISTOR_PIN = 29  # Pin for the photoresistor
+PCA_SWITCH_PIN = 28  # Pin to control the PCA9685 modules
+# PHOTORESISTOR_PIN = 28  # Pin for the photoresistor
+# PCA_SWITCH_PIN = 27  # Pin to control the PCA9685 modules
+LIGHT_THRESHOLD = 2
+LIGHT_DETECTION_SLEEP = 30  # Sleep time in seconds for light detection
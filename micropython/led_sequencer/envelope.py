@@ -0,0 +1,101 @@
+"""
+Precomputed fade envelopes.
+
+A fade rises to its peak over n ticks and falls back over n ticks. The rising half is
+stored as a table of 12 bit PCA9685 duty cycles in an array('H'); the falling half is
+the same table read backwards, ending at 0. Tables are memoized per (peak, n) pair in
+a small bounded cache, so playing an envelope is an index lookup instead of float math
+on every tick.
+
+The ramp is gamma corrected: the envelope moves linearly in perceived brightness and
+the table holds the matching duty cycles. The peak itself is the ``lu`` brightness the
+sequence was authored with. Every step before the final off is at least 1 count, so
+even 1-2% fades glow smoothly instead of snapping on and off.
+
+transition() builds the tables for the parametric ramps in a sequence: a one way move
+from one duty cycle to another over n ticks, either gamma corrected like the envelopes
+(CURVE_GAMMA) or straight in duty cycle (CURVE_LINEAR). They share the same cache.
+
+Pure Python, so the designer apps can import it to preview sequences.
+"""
+from array import array
+
+GAMMA = 2.2  # Envelope shape, 1.0 gives the plain linear ramp
+MAX_DUTY = 4095  # 12 bit PCA9685 duty cycle
+MAX_TICKS = 0x3FFF  # Longest half envelope, in ticks
+CACHE_SIZE = 24  # Envelope tables kept in RAM
+CURVE_GAMMA = 0
+CURVE_LINEAR = 1
+CURVES = ("gamma", "linear")  # Curve names used in the JSON sequences, by curve number
+
+_cache = {}
+_cache_order = []
+hits = 0
+misses = 0
+
+def lu_to_duty(lu):
+    """Brightness in percent to a 12 bit duty cycle"""
+    return max(0, min(MAX_DUTY, int(lu * MAX_DUTY / 100 + 0.5)))
+
+def ramp(peak, n, gamma=GAMMA):
+    """Build the rising half of an envelope: n 12 bit duty cycles ending at ``peak``"""
+    table = array("H", [0] * n)
+    for k in range(n):
+        duty = int(peak * ((k + 1) / n) ** gamma + 0.5)
+        if duty < 1 and peak:
+            duty = 1
+        table[k] = duty
+    return table
+
+def transition_ramp(start, end, n, curve=CURVE_GAMMA, gamma=GAMMA):
+    """Build a one way ramp: n 12 bit duty cycles moving from ``start`` to ending at ``end``"""
+    table = array("H", [0] * n)
+    if curve == CURVE_GAMMA:
+        # Move linearly in perceived brightness
+        a = (start / MAX_DUTY) ** (1 / gamma)
+        b = (end / MAX_DUTY) ** (1 / gamma)
+        for k in range(n):
+            table[k] = int(MAX_DUTY * (a + (b - a) * (k + 1) / n) ** gamma + 0.5)
+    else:
+        for k in range(n):
+            table[k] = int(start + (end - start) * (k + 1) / n + 0.5)
+    return table
+
+def _cached(key, build, *args):
+    global hits, misses
+    table = _cache.get(key)
+    if table is not None:
+        hits += 1
+        return table
+    misses += 1
+    if len(_cache_order) >= CACHE_SIZE:
+        del _cache[_cache_order.pop(0)]
+    table = build(*args)
+    _cache[key] = table
+    _cache_order.append(key)
+    return table
+
+def get(peak, n):
+    """Memoized ramp() for a 12 bit ``peak`` and ``n`` ticks per half"""
+    n = max(1, min(MAX_TICKS, n))
+    return _cached((peak << 14) | n, ramp, peak, n)
+
+def transition(start, end, n, curve=CURVE_GAMMA):
+    """Memoized transition_ramp() between 12 bit duty cycles over ``n`` ticks"""
+    n = max(1, min(MAX_TICKS, n))
+    return _cached((start, end, n, curve), transition_ramp, start, end, n, curve)
+
+def duty_at(table, k):
+    """12 bit duty cycle at tick ``k`` of the full up and down envelope"""
+    n = len(table)
+    if k < n:
+        return table[k]
+    if k < 2 * n - 1:
+        return table[2 * n - 2 - k]
+    return 0
+
+def clear():
+    global hits, misses
+    _cache.clear()
+    del _cache_order[:]
+    hits = misses = 0
@@ -0,0 +1,95 @@
+"""
+Pick the fastest I2C clock the PCA9685 modules on this board run reliably at.
+
+The PCA9685 supports Fast-mode Plus (1 MHz), but long wires and pull-ups decide what
+actually works. select() tries each clock in CLOCK_CANDIDATES, fastest first, and
+keeps the first one where every module answers and a test pattern written to its
+SUBADR1 register reads back intact. The winner is saved to CONFIG_FILE so later
+boots only re-verify it; if that check or any probe raises OSError it falls back to
+the next slower clock.
+"""
+import ujson
+import utime
+
+CLOCK_CANDIDATES = (1000000, 400000, 100000)  # Hz, fastest first
+CONFIG_FILE = "i2c_clock.json"
+SETTLE_TIME = 0.01  # Seconds to let the bus settle after changing clock
+_SUBADR1 = 0x02  # Harmless to write: only answered when MODE1 SUB1 is set
+_SUBADR1_DEFAULT = 0xE2
+_TEST_PATTERNS = (0x55, 0xAA)
+
+
+def load_clock():
+    try:
+        with open(CONFIG_FILE, "r") as f:
+            return ujson.load(f).get("i2c_freq")
+    except (OSError, ValueError):
+        return None
+
+
+def save_clock(freq):
+    try:
+        with open(CONFIG_FILE, "w") as f:
+            ujson.dump({"i2c_freq": freq}, f)
+    except OSError:
+        pass  # Read-only or full flash, probe again next boot
+
+
+def forget_clock():
+    try:
+        import os
+
+        os.remove(CONFIG_FILE)
+    except OSError:
+        pass
+
+
+def verify(i2c, addresses):
+    """True when every address answers and round trips the test patterns"""
+    try:
+        found = i2c.scan()
+        for address in addresses:
+            if address not in found:
+                return False
+            for pattern in _TEST_PATTERNS:
+                i2c.writeto_mem(address, _SUBADR1, bytes((pattern,)))
+                if i2c.readfrom_mem(address, _SUBADR1, 1)[0] != pattern:
+                    return False
+            i2c.writeto_mem(address, _SUBADR1, bytes((_SUBADR1_DEFAULT,)))
+    except OSError:
+        return False
+    return True
+
+
+def select(make_i2c, addresses, candidates=CLOCK_CANDIDATES):
+    """
+    Returns (i2c, freq) for the fastest clock that passes verify().
+
+    make_i2c(freq) builds the bus, e.g. ``lambda f: I2C(1, sda=Pin(6), scl=Pin(7), freq=f)``.
+    If nothing passes, the slowest candidate is returned with freq None and nothing is cached.
+    """
+    cached = load_clock()
+    if cached in candidates:
+        i2c = make_i2c(cached)
+        utime.sleep(SETTLE_TIME)
+        if verify(i2c, addresses):
+            return i2c, cached
+        # Wiring changed or the cached clock has gone marginal, probe from the top
+        forget_clock()
+
+    for freq in candidates:
+        i2c = make_i2c(freq)
+        utime.sleep(SETTLE_TIME)
+        if verify(i2c, addresses):
+            save_clock(freq)
+            return i2c, freq
+
+    return make_i2c(candidates[-1]), None
+
+
+def slower(freq, candidates=CLOCK_CANDIDATES):
+    """The next candidate below ``freq``, or None when already at the slowest"""
+    for candidate in candidates:
+        if freq is not None and candidate < freq:
+            return candidate
+    return None
@@ -0,0 +1,166 @@
+"""
+Flush the animator's I2C frames from the RP2040's second core.
+
+With DUAL_CORE on in runsequence.py, the animator no longer calls PCA9685.set_frame()
+itself. It copies each module's changed channels into a preallocated ring of frames,
+guarded by a lock, and a thread started with _thread (which MicroPython runs on core 1)
+drains the ring onto the bus. Core 0 keeps sequencing, parsing JSON, collecting garbage
+and reading the light sensor, and a blocking writeto_mem no longer holds up the fades.
+
+Only the worker touches the modules while it runs. Anything else that needs the bus
+takes ``bus_lock`` around its writes. When the ring is full, submit() returns False and
+the animator keeps the channels dirty for its next tick, so no change is lost. Channels
+whose write fails with OSError are handed back through take_failed() the same way.
+
+On the host the same API runs on ``threading``, against the emulator's I2C.
+"""
+import sys
+from array import array
+import utime
+
+if sys.implementation.name == "micropython":
+    import _thread
+
+    allocate_lock = _thread.allocate_lock
+
+    def start_thread(function):
+        _thread.start_new_thread(function, ())
+else:
+    # Host fallback for testing with the emulator
+    import threading
+
+    allocate_lock = threading.Lock
+
+    def start_thread(function):
+        threading.Thread(target=function, daemon=True).start()
+
+RING_FRAMES = 16  # Pending frames, a few ticks' worth for all four modules
+CHANNELS_PER_MODULE = 16
+IDLE_POLL_US = 200  # Worker sleep while the ring is empty
+
+class I2CWorker:
+    """
+    Owns the PCA9685 modules on a second thread and writes the frames queued for them.
+
+    :param list pca: The PCA9685 modules, indexed by module number
+    :param int frames: Ring size in frames
+    """
+    def __init__(self, pca, frames=RING_FRAMES):
+        self.pca = pca
+        self._size = frames
+        self._values = array("H", [0] * (frames * CHANNELS_PER_MODULE))
+        self._module = bytearray(frames)
+        self._first = bytearray(frames)
+        self._count = bytearray(frames)
+        self._head = 0  # Next slot to fill
+        self._tail = 0  # Next slot to write
+        self._used = 0
+        self._lock = allocate_lock()  # Guards the ring
+        self.bus_lock = allocate_lock()
+        """Held while a frame is on the bus, take it to use the modules from core 0"""
+        self._out = array("H", [0] * CHANNELS_PER_MODULE)
+        self._failed = [0] * len(pca)  # Per module, bitmask of channels whose write failed
+        self._running = False
+        self._stopped = True
+        self.flushed = 0
+        """Frames written"""
+        self.ring_full = 0
+        """Frames the animator had to hold back for a tick"""
+        self.errors = 0
+        """Frames that failed with OSError"""
+
+    def submit(self, module, frame, first, n):
+        """Queue channels ``first`` to ``first + n - 1`` of a module's 16 channel ``frame``,
+        False when the ring is full"""
+        self._lock.acquire()
+        if self._used == self._size:
+            self._lock.release()
+            self.ring_full += 1
+            return False
+        slot = self._head
+        base = slot * CHANNELS_PER_MODULE
+        ring = self._values
+        for i in range(first, first + n):
+            ring[base + i] = frame[i]
+        self._module[slot] = module
+        self._first[slot] = first
+        self._count[slot] = n
+        self._head = (slot + 1) % self._size
+        self._used += 1
+        self._lock.release()
+        return True
+
+    def clear(self):
+        """Drop the frames still waiting, e.g. before switching everything off"""
+        self._lock.acquire()
+        self._head = self._tail = self._used = 0
+        self._lock.release()
+
+    def take_failed(self, module):
+        """Bitmask of the module's channels whose write failed since the last call"""
+        if not self._failed[module]:
+            return 0
+        self._lock.acquire()
+        mask = self._failed[module]
+        self._failed[module] = 0
+        self._lock.release()
+        return mask
+
+    @property
+    def pending(self):
+        return self._used
+
+    def _run(self):
+        try:
+            self._drain()
+        finally:
+            self._stopped = True  # Even if the worker died, so stop() returns
+
+    def _drain(self):
+        ring = self._values
+        out = self._out
+        while True:
+            # bus_lock is held from taking a frame off the ring until it is written, so a
+            # frame can't reach the bus after a clear() and blackout() that took the lock
+            self.bus_lock.acquire()
+            self._lock.acquire()
+            if not self._used:
+                self._lock.release()
+                self.bus_lock.release()
+                if not self._running:
+                    break
+                utime.sleep_us(IDLE_POLL_US)
+                continue
+            # Copy the frame out so the ring slot is free while the bus is busy
+            slot = self._tail
+            base = slot * CHANNELS_PER_MODULE
+            n = self._count[slot]
+            first = self._first[slot]
+            for i in range(first, first + n):
+                out[i] = ring[base + i]
+            module = self._module[slot]
+            self._tail = (slot + 1) % self._size
+            self._used -= 1
+            self._lock.release()
+            try:
+                self.pca[module].set_frame(out, first, n)
+                self.flushed += 1
+            except OSError:
+                # Hand the channels back, the animator sends its latest values on its next tick
+                self.errors += 1
+                self._lock.acquire()
+                self._failed[module] |= ((1 << n) - 1) << first
+                self._lock.release()
+            finally:
+                self.bus_lock.release()
+
+    def start(self):
+        self._running = True
+        self._stopped = False
+        start_thread(self._run)
+
+    def stop(self):
+        """Write what is queued, then end the worker. Blocks until it has."""
+        self._running = False
+        while not self._stopped:
+            utime.sleep_ms(1)
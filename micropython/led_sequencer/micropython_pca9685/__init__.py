@@ -11,5 +11,5 @@ Driver for the PCA9685 PWM control IC. Its commonly used to control servos, leds
 
 """
 
-from .pca9685 import PCA9685
+from .pca9685 import PCA9685, PCA9685AllCall
 from .motor import Servo
@@ -43,6 +43,18 @@ SOFTWARE.
 import struct
 
 
+def _scratch(obj, buffer_id: str, length: int) -> bytearray:
+    """
+    Returns the device's reusable buffer for a register descriptor, creating it on first use.
+    The buffer lives on the device object so every instance gets its own.
+    """
+    buffer = getattr(obj, buffer_id, None)
+    if buffer is None:
+        buffer = bytearray(length)
+        setattr(obj, buffer_id, buffer)
+    return buffer
+
+
 class CBits:
     """
     Changes bits from a byte register
@@ -61,13 +73,15 @@ class CBits:
         self.star_bit = start_bit
         self.lenght = register_width
         self.lsb_first = lsb_first
+        self.buffer_id = "_cbits{}_{}".format(register_address, register_width)
 
     def __get__(
         self,
         obj,
         objtype=None,
     ) -> int:
-        mem_value = obj._i2c.readfrom_mem(obj._address, self.register, self.lenght)
+        mem_value = _scratch(obj, self.buffer_id, self.lenght)
+        obj._i2c.readfrom_mem_into(obj._address, self.register, mem_value)
 
         reg = 0
         order = range(len(mem_value) - 1, -1, -1)
@@ -81,7 +95,8 @@ class CBits:
         return reg
 
     def __set__(self, obj, value: int) -> None:
-        memory_value = obj._i2c.readfrom_mem(obj._address, self.register, self.lenght)
+        memory_value = _scratch(obj, self.buffer_id, self.lenght)
+        obj._i2c.readfrom_mem_into(obj._address, self.register, memory_value)
 
         reg = 0
         order = range(len(memory_value) - 1, -1, -1)
@@ -93,9 +108,12 @@ class CBits:
 
         value <<= self.star_bit
         reg |= value
-        reg = reg.to_bytes(self.lenght, "big")
+        # Same byte order as reg.to_bytes(self.lenght, "big"), written back into the read buffer
+        for i in range(self.lenght - 1, -1, -1):
+            memory_value[i] = reg & 0xFF
+            reg >>= 8
 
-        obj._i2c.writeto_mem(obj._address, self.register, reg)
+        obj._i2c.writeto_mem(obj._address, self.register, memory_value)
 
 
 class RegisterStruct:
@@ -107,30 +125,24 @@ class RegisterStruct:
         self.format = form
         self.register = register_address
         self.lenght = struct.calcsize(form)
+        self.buffer_id = "_register{}".format(register_address)
 
     def __get__(
         self,
         obj,
         objtype=None,
     ):
+        mem_value = _scratch(obj, self.buffer_id, self.lenght)
+        obj._i2c.readfrom_mem_into(obj._address, self.register, mem_value)
         if self.lenght <= 2:
-            value = struct.unpack(
-                self.format,
-                memoryview(
-                    obj._i2c.readfrom_mem(obj._address, self.register, self.lenght)
-                ),
-            )[0]
+            value = struct.unpack_from(self.format, mem_value)[0]
         else:
-            value = struct.unpack(
-                self.format,
-                memoryview(
-                    obj._i2c.readfrom_mem(obj._address, self.register, self.lenght)
-                ),
-            )
+            value = struct.unpack_from(self.format, mem_value)
         return value
 
     def __set__(self, obj, value):
-        mem_value = struct.pack(self.format, value)
+        mem_value = _scratch(obj, self.buffer_id, self.lenght)
+        struct.pack_into(self.format, mem_value, 0, value)
         obj._i2c.writeto_mem(obj._address, self.register, mem_value)
 
 
@@ -156,23 +168,24 @@ class _BoundStructArray:
         self.obj = obj
         self.count = count
         self.length = struct.calcsize(struct_format)
+        self._buffer = bytearray(self.length)
 
     def __getitem__(self, index):
         if not 0 <= index < self.count:
             raise IndexError()
         reg_to_get = self.first_register + self.length * index
-        value = struct.unpack(
-            self.format,
-            memoryview(
-                self.obj._i2c.readfrom_mem(self.obj._address, reg_to_get, self.length)
-            ),
-        )
+        self.obj._i2c.readfrom_mem_into(self.obj._address, reg_to_get, self._buffer)
+        value = struct.unpack_from(self.format, self._buffer)
         return value
 
     def __setitem__(self, index, value) -> None:
         reg_to_write = self.first_register + self.length * index
-        mem_value = struct.pack(self.format, *value)
-        self.obj._i2c.writeto_mem(self.obj._address, reg_to_write, mem_value)
+        if len(value) == 2:
+            # The usual register pair, MicroPython allocates the argument array of a * call
+            struct.pack_into(self.format, self._buffer, 0, value[0], value[1])
+        else:
+            struct.pack_into(self.format, self._buffer, 0, *value)
+        self.obj._i2c.writeto_mem(self.obj._address, reg_to_write, self._buffer)
 
     def __len__(self) -> int:
         return self.count
@@ -0,0 +1,170 @@
+"""
+`i2c_profiler`
+================================================================================
+
+Opt-in bus instrumentation for the PCA9685 driver.
+
+Wrap the I2C object before handing it to `PCA9685` and every register access made by
+the driver and the `i2c_helpers` descriptors is counted per device address and per
+register: transactions, bytes, redundant writes (data equal to what was last written)
+and call latency in microseconds. When profiling is off, pass the plain I2C object
+and nothing is wrapped, so field builds pay nothing for it.
+
+.. code-block:: python
+
+    i2c = I2CProfiler(I2C(1, sda=Pin(6), scl=Pin(7)))
+    pca = PCA9685(i2c, address=0x40)
+    ...
+    i2c.dump()  # or i2c.dump("i2c_profile.txt") to append to a file on flash
+
+"""
+
+from utime import ticks_us, ticks_diff
+
+_LED0_ON_L = 0x06
+_LED15_OFF_H = 0x45
+_ALL_LED_ON_L = 0xFA
+_ALL_LED_OFF_H = 0xFD
+_ALLCALL_ADDRESS = 0x70  # Power on default of the ALLCALLADR register
+
+
+class I2CProfiler:
+    """Counts the traffic going through an I2C object. Same methods as ``machine.I2C``.
+
+    Redundant writes are judged against the PCA9685 register map: an ALL_LED byte is
+    written to the same byte of all 16 channels, auto increment wraps from LED15_OFF_H and
+    ALL_LED_OFF_H back to MODE1, and a write to the All Call address leaves the registers
+    it touched unknown on every other device, and the other way around.
+
+    :param i2c: The I2C bus object to wrap
+    :param allcall_address: The All Call address the modules answer to. Defaults to ``0x70``
+    """
+
+    def __init__(self, i2c, allcall_address: int = _ALLCALL_ADDRESS) -> None:
+        self._i2c = i2c
+        self._allcall = allcall_address
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all counters."""
+        # (address << 8 | register) -> [reads, writes, bytes, redundant writes, total us, max us]
+        self.registers = {}
+        # Last data written per device, to spot redundant writes
+        self._images = {}
+        self._known = {}
+
+    def _count(self, address: int, register: int, nbytes: int, write: bool, redundant: bool, elapsed: int):
+        key = (address << 8) | register
+        stats = self.registers.get(key)
+        if stats is None:
+            stats = [0, 0, 0, 0, 0, 0]
+            self.registers[key] = stats
+        stats[1 if write else 0] += 1
+        stats[2] += nbytes
+        if redundant:
+            stats[3] += 1
+        stats[4] += elapsed
+        if elapsed > stats[5]:
+            stats[5] = elapsed
+
+    def _remember(self, address: int, register: int, buf) -> bool:
+        """Record written data, returns True when every byte was already known to hold it"""
+        redundant = self._apply(address, register, buf, False)
+        # The modules answer to All Call writes too, so neither image holds for those registers
+        for other in self._known:
+            if other != address and (address == self._allcall or other == self._allcall):
+                self._apply(other, register, buf, True)
+        return redundant
+
+    def _apply(self, address: int, register: int, buf, forget: bool) -> bool:
+        """Write buf into the register image of a device, or mark the registers it lands on unknown"""
+        image = self._images.get(address)
+        if image is None:
+            image = self._images[address] = bytearray(256)
+            self._known[address] = bytearray(256)
+        known = self._known[address]
+        redundant = True
+        reg = register
+        for i in range(len(buf)):
+            value = buf[i]
+            if _ALL_LED_ON_L <= reg <= _ALL_LED_OFF_H:
+                # Lands on the same byte of every channel
+                targets = range(_LED0_ON_L + reg - _ALL_LED_ON_L, _LED15_OFF_H + 1, 4)
+            else:
+                targets = range(reg, reg + 1)
+            for target in targets:
+                if forget:
+                    known[target] = 0
+                    continue
+                if not known[target] or image[target] != value:
+                    redundant = False
+                image[target] = value
+                known[target] = 1
+            # Auto increment stops at the end of the LED and ALL_LED blocks and wraps to MODE1
+            reg = 0 if reg in (_LED15_OFF_H, _ALL_LED_OFF_H) else (reg + 1) & 0xFF
+        return redundant
+
+    def readfrom_mem(self, addr: int, memaddr: int, nbytes: int, **kwargs):
+        start = ticks_us()
+        data = self._i2c.readfrom_mem(addr, memaddr, nbytes, **kwargs)
+        self._count(addr, memaddr, nbytes, False, False, ticks_diff(ticks_us(), start))
+        return data
+
+    def readfrom_mem_into(self, addr: int, memaddr: int, buf, **kwargs) -> None:
+        start = ticks_us()
+        self._i2c.readfrom_mem_into(addr, memaddr, buf, **kwargs)
+        self._count(addr, memaddr, len(buf), False, False, ticks_diff(ticks_us(), start))
+
+    def writeto_mem(self, addr: int, memaddr: int, buf, **kwargs) -> None:
+        start = ticks_us()
+        self._i2c.writeto_mem(addr, memaddr, buf, **kwargs)
+        elapsed = ticks_diff(ticks_us(), start)
+        self._count(addr, memaddr, len(buf), True, self._remember(addr, memaddr, buf), elapsed)
+
+    def __getattr__(self, name):
+        # scan(), writeto() and the rest go straight to the real bus
+        return getattr(self._i2c, name)
+
+    def summary(self):
+        """Compact text summary: one line per address, then one per register it touched."""
+        per_address = {}
+        for key, stats in self.registers.items():
+            totals = per_address.get(key >> 8)
+            if totals is None:
+                totals = per_address[key >> 8] = [0, 0, 0, 0, 0, 0]
+            for i in range(5):
+                totals[i] += stats[i]
+            if stats[5] > totals[5]:
+                totals[5] = stats[5]
+        lines = []
+        for address in sorted(per_address):
+            r, w, nbytes, redundant, total_us, max_us = per_address[address]
+            lines.append(
+                "0x{:02x} r{} w{} {}B dup{} {}us max{}us".format(
+                    address, r, w, nbytes, redundant, total_us, max_us
+                )
+            )
+            for key in sorted(self.registers):
+                if key >> 8 != address:
+                    continue
+                r, w, nbytes, redundant, total_us, max_us = self.registers[key]
+                lines.append(
+                    "  0x{:02x} r{} w{} {}B dup{} {}us max{}us".format(
+                        key & 0xFF, r, w, nbytes, redundant, total_us, max_us
+                    )
+                )
+        return lines
+
+    def dump(self, path=None, reset: bool = True) -> None:
+        """Print the summary, or append it to ``path`` on flash, then clear the counters."""
+        lines = self.summary()
+        if path is None:
+            for line in lines:
+                print(line)
+        else:
+            with open(path, "a") as f:
+                for line in lines:
+                    f.write(line + "\n")
+                f.write("--\n")
+        if reset:
+            self.reset()
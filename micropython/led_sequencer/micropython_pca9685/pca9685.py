@@ -18,8 +18,19 @@ servos, leds and motors.
 """
 
 import time
+import struct
+from array import array
 from micropython_pca9685.i2c_helpers import RegisterStruct, StructArray
 
+_LED0_ON_L = 0x06
+_ALL_LED_ON_L = 0xFA
+_ALLCALL_ADDRESS = 0x70  # Power on default of the ALLCALLADR register
+_MODE1_ALLCALL = 0x01
+_LED_REG_WIDTH = 4
+_NUM_CHANNELS = 16
+_UNKNOWN = 0xFFFF  # Shadow marker, the LEDn_ON/OFF registers only hold 13 bits
+_OSCILLATOR_STARTUP = 0.0005  # Seconds, the datasheet maximum after clearing SLEEP
+
 
 class PWMChannel:
     """A single PCA9685 channel that matches the :py:class:`~pwmio.PWMOut` API.
@@ -48,7 +59,7 @@ class PWMChannel:
         """16 bit value that dictates how much of one cycle is high (1) versus low (0). 0xffff will
         always be high, 0 will always be low and 0x7fff will be half high and then half low.
         """
-        pwm = self._pca.pwm_regs[self._index]
+        pwm = self._pca._read_pwm(self._index)
 
         if pwm[0] == 0x1000:
             return 0xFFFF
@@ -58,20 +69,7 @@ class PWMChannel:
 
     @duty_cycle.setter
     def duty_cycle(self, value: int) -> None:
-        if not 0 <= value <= 0xFFFF:
-            raise ValueError(f"Out of range: value {value} not 0 <= value <= 65,535")
-
-        if value == 0xFFFF:
-            # Special case for "fully on":
-            self._pca.pwm_regs[self._index] = (0x1000, 0)
-        elif value < 0x0010:
-            # Special case for "fully off":
-            self._pca.pwm_regs[self._index] = (0, 0x1000)
-        else:
-            # Shift our value by four because the PCA9685 is only 12 bits but our value is 16
-            value = value >> 4
-
-            self._pca.pwm_regs[self._index] = (0, value)
+        self._pca._write_duty(self._index, value)
 
 
 class PCAChannels:
@@ -100,6 +98,17 @@ class PCA9685:
     accuracy of the frequency and duty_cycle computations. See the ``calibration.py`` example for
     how to derive this value by measuring the resulting pulse widths.
 
+    With ``cache=True`` the driver keeps an in-RAM shadow of MODE1, MODE2, PRESCALE and the 16
+    LEDn_ON/OFF register pairs. Reads are served from the shadow and writes that would not change
+    the register are skipped. Call `invalidate` (or `sync`) after the chip loses power, since the
+    shadow can no longer be trusted.
+
+    :param i2c: The I2C bus the chip is connected to
+    :param int address: The I2C address of the chip
+    :param int reference_clock_speed: The reference clock speed in Hz
+    :param bool cache: Enable the shadow register cache
+    :param bool reset: Reset MODE1 on creation. Pass False when the chip is set up through
+        a `PCA9685AllCall` broadcast instead
     """
 
     # Registers:
@@ -114,24 +123,144 @@ class PCA9685:
         *,
         address: int = 0x40,
         reference_clock_speed: int = 25000000,
+        cache: bool = False,
+        reset: bool = True,
     ) -> None:
         self._i2c = i2c
         self._address = address
+        self._cache = cache
+        # Shadow registers, _UNKNOWN (or missing) until the value is known
+        self._shadow = {}
+        self._pwm_shadow = array("H", [_UNKNOWN] * (_NUM_CHANNELS * 2))
 
         self.channels = PCAChannels(self)
         """Sequence of 16 `PWMChannel` objects. One for each channel."""
         self.reference_clock_speed = reference_clock_speed
         """The reference clock speed in Hz."""
-        self.reset()
+        # Image of the LEDn_ON/OFF registers, packed in place and sent straight from here so
+        # a duty cycle write does not allocate
+        self._frame = bytearray(_NUM_CHANNELS * _LED_REG_WIDTH)
+        self._frame_view = memoryview(self._frame)
+        self._channel_views = [
+            self._frame_view[i * _LED_REG_WIDTH : (i + 1) * _LED_REG_WIDTH]
+            for i in range(_NUM_CHANNELS)
+        ]
+        # Views of the image per span of channels, made the first time a span is sent since
+        # slicing a memoryview allocates a new one on every write
+        self._span_views = [None] * (_NUM_CHANNELS * _NUM_CHANNELS)
+        if reset:
+            self.reset()
 
     def reset(self) -> None:
         """Reset the chip."""
         self.mode1_reg = 0x00  # Mode1
+        if self._cache:
+            self._shadow["mode1_reg"] = 0x00
+
+    def sync(self) -> None:
+        """Reload the shadow registers from the chip. Does nothing when the cache is disabled."""
+        if not self._cache:
+            return
+        self.invalidate()
+        for name in ("mode1_reg", "mode2_reg", "prescale_reg"):
+            self._read_reg(name)
+        for index in range(_NUM_CHANNELS):
+            self._read_pwm(index)
+
+    def invalidate(self) -> None:
+        """Forget the shadow registers, e.g. after the modules were power cycled.
+
+        The next read of each register goes to the chip and the next write always goes out.
+        """
+        self._shadow = {}
+        for i in range(_NUM_CHANNELS * 2):
+            self._pwm_shadow[i] = _UNKNOWN
+
+    def _read_reg(self, name: str) -> int:
+        if self._cache:
+            value = self._shadow.get(name)
+            if value is not None:
+                return value
+        value = getattr(self, name)
+        if self._cache:
+            self._shadow[name] = value
+        return value
+
+    def _write_reg(self, name: str, value: int) -> None:
+        if self._cache:
+            if self._shadow.get(name) == value:
+                return
+            self._shadow[name] = value
+        setattr(self, name, value)
+
+    def _assume_reg(self, name: str, value: int) -> None:
+        """Record a value written to the chip by someone else, e.g. a broadcast."""
+        if self._cache:
+            self._shadow[name] = value
+
+    def _read_pwm(self, index: int):
+        shadow = self._pwm_shadow
+        j = index * 2
+        if self._cache and shadow[j] != _UNKNOWN:
+            return shadow[j], shadow[j + 1]
+        pwm = self.pwm_regs[index]
+        if self._cache:
+            shadow[j] = pwm[0]
+            shadow[j + 1] = pwm[1]
+            struct.pack_into("<HH", self._frame, index * _LED_REG_WIDTH, pwm[0], pwm[1])
+        return pwm
+
+    def _stage_duty(self, index: int, value: int) -> bool:
+        """Pack a 16 bit duty cycle into the register image for channel ``index``.
+
+        Returns False, leaving the image untouched, when the cache shows the channel
+        already holds that value.
+        """
+        if not 0 <= value <= 0xFFFF:
+            raise ValueError(f"Out of range: value {value} not 0 <= value <= 65,535")
+
+        if value == 0xFFFF:
+            # Special case for "fully on":
+            on, off = 0x1000, 0
+        elif value < 0x0010:
+            # Special case for "fully off":
+            on, off = 0, 0x1000
+        else:
+            # Shift our value by four because the PCA9685 is only 12 bits but our value is 16
+            on, off = 0, value >> 4
+
+        if self._cache:
+            shadow = self._pwm_shadow
+            j = index * 2
+            if shadow[j] == on and shadow[j + 1] == off:
+                return False
+            shadow[j] = on
+            shadow[j + 1] = off
+        struct.pack_into("<HH", self._frame, index * _LED_REG_WIDTH, on, off)
+        return True
+
+    def _forget_duty(self, first: int, end: int) -> None:
+        """Mark channels ``first`` to ``end - 1`` unknown in the shadow, after a write that
+        failed, since it is unknown what reached the chip and a retry must go out."""
+        for j in range(first * 2, end * 2):
+            self._pwm_shadow[j] = _UNKNOWN
+
+    def _write_duty(self, index: int, value: int) -> None:
+        if self._stage_duty(index, value):
+            try:
+                self._i2c.writeto_mem(
+                    self._address,
+                    _LED0_ON_L + index * _LED_REG_WIDTH,
+                    self._channel_views[index],
+                )
+            except OSError:
+                self._forget_duty(index, index + 1)
+                raise
 
     @property
     def frequency(self) -> float:
         """The overall PWM frequency in Hertz."""
-        prescale_result = self.prescale_reg
+        prescale_result = self._read_reg("prescale_reg")
         if prescale_result < 3:
             raise ValueError(
                 "The device pre_scale register (0xFE) was not read or returned a value < 3"
@@ -143,13 +272,82 @@ class PCA9685:
         prescale = int(self.reference_clock_speed / 4096.0 / freq + 0.5)
         if prescale < 3:
             raise ValueError("PCA9685 cannot output at the given frequency")
-        old_mode = self.mode1_reg  # Mode 1
-        self.mode1_reg = (old_mode & 0x7F) | 0x10  # Mode 1, sleep
-        self.prescale_reg = prescale  # Prescale
-        self.mode1_reg = old_mode  # Mode 1
-        time.sleep(0.005)
+        old_mode = self._read_reg("mode1_reg")  # Mode 1
+        if self._cache and self._shadow.get("prescale_reg") == prescale and old_mode & 0xA0 == 0xA0:
+            # Already running at this prescale with autoincrement on
+            return
+        self._write_reg("mode1_reg", (old_mode & 0x7F) | 0x10)  # Mode 1, sleep
+        self._write_reg("prescale_reg", prescale)  # Prescale
+        self._write_reg("mode1_reg", old_mode)  # Mode 1
+        time.sleep(_OSCILLATOR_STARTUP)
         # Mode 1, autoincrement on, fix to stop pca9685 from accepting commands at all addresses
-        self.mode1_reg = old_mode | 0xA0
+        self._write_reg("mode1_reg", old_mode | 0xA0)
+
+    def set_many(self, first: int, duty_cycles) -> None:
+        """Write the duty cycle of a contiguous run of channels in a single I2C transaction.
+
+        The LEDn_ON/OFF registers of channels ``first`` to ``first + len(duty_cycles) - 1``
+        are packed into a preallocated buffer and sent as one burst, relying on the MODE1
+        auto-increment bit that the `frequency` setter turns on. With the cache enabled only the
+        span between the first and last channel that actually changed is sent.
+
+        :param int first: The index of the first channel to write
+        :param duty_cycles: Sequence of 16 bit duty cycles, same scale as `PWMChannel.duty_cycle`
+        """
+        self._set_span(first, len(duty_cycles), duty_cycles, first)
+
+    def set_frame(self, frame, first: int, count: int) -> None:
+        """Like ``set_many(first, frame[first:first + count])`` without slicing the frame.
+
+        :param frame: 16 bit duty cycles of all 16 channels, indexed by channel
+        :param int first: The index of the first channel to write
+        :param int count: Number of channels to write
+        """
+        self._set_span(first, count, frame, 0)
+
+    def _set_span(self, first: int, count: int, duty_cycles, base: int) -> None:
+        # Channel i takes duty_cycles[i - base]
+        if first < 0 or first + count > _NUM_CHANNELS:
+            raise IndexError(f"Channels {first}..{first + count - 1} out of range 0..15")
+        start = end = -1
+        for i in range(first, first + count):
+            # Unchanged channels inside the span are resent from the register image as is
+            if self._stage_duty(i, duty_cycles[i - base]):
+                if start < 0:
+                    start = i
+                end = i + 1
+        if start < 0:
+            return
+        span = start * _NUM_CHANNELS + end - 1
+        view = self._span_views[span]
+        if view is None:
+            view = self._frame_view[start * _LED_REG_WIDTH : end * _LED_REG_WIDTH]
+            self._span_views[span] = view
+        try:
+            self._i2c.writeto_mem(self._address, _LED0_ON_L + start * _LED_REG_WIDTH, view)
+        except OSError:
+            self._forget_duty(start, end)
+            raise
+
+    def set_all(self, value: int) -> None:
+        """Set every channel to the same duty cycle with a single write to the ALL_LED registers.
+
+        Like `set_many` this relies on the MODE1 auto-increment bit that the `frequency` setter
+        turns on. Skipped when the cache shows every channel already holds the value.
+
+        :param int value: 16 bit duty cycle, same scale as `PWMChannel.duty_cycle`
+        """
+        changed = False
+        for i in range(_NUM_CHANNELS):
+            if self._stage_duty(i, value):
+                changed = True
+        if changed:
+            # Every channel now holds the same packed registers, send channel 0's
+            try:
+                self._i2c.writeto_mem(self._address, _ALL_LED_ON_L, self._channel_views[0])
+            except OSError:
+                self._forget_duty(0, _NUM_CHANNELS)
+                raise
 
     def __enter__(self):
         return self
@@ -165,3 +363,75 @@ class PCA9685:
     def deinit(self) -> None:
         """Stop using the pca9685."""
         self.reset()
+
+
+class PCA9685AllCall(PCA9685):
+    """
+    Write-only handle on the LED All Call address, every PCA9685 with All Call enabled
+    answers to it. All Call is on from power on and the writes made here keep it on, so a
+    freshly powered board can be configured and blanked in a handful of transactions instead
+    of a few per chip.
+
+    Pass the per-chip driver objects as ``modules`` and their shadow registers are updated
+    along with every broadcast, so they stay usable with ``cache=True``. Those can be created
+    with ``reset=False`` since `frequency` here sets up MODE1 on all of them. Nothing can be
+    read back through the broadcast address.
+
+    :param i2c: The I2C bus the chips are connected to
+    :param modules: The `PCA9685` objects of the chips on the bus
+    :param int address: The LED All Call address
+    :param int reference_clock_speed: The reference clock speed in Hz
+    """
+
+    def __init__(
+        self,
+        i2c,
+        modules=(),
+        *,
+        address: int = _ALLCALL_ADDRESS,
+        reference_clock_speed: int = 25000000,
+    ) -> None:
+        self.modules = modules
+        self._frequency = None
+        super().__init__(
+            i2c, address=address, reference_clock_speed=reference_clock_speed, reset=False
+        )
+
+    def reset(self) -> None:
+        """Reset every chip, leaving All Call enabled."""
+        self.mode1_reg = _MODE1_ALLCALL
+        for module in self.modules:
+            module._assume_reg("mode1_reg", _MODE1_ALLCALL)
+
+    @property
+    def frequency(self) -> float:
+        """The PWM frequency in Hertz last set through the broadcast, None until set."""
+        return self._frequency
+
+    @frequency.setter
+    def frequency(self, freq: float) -> None:
+        prescale = int(self.reference_clock_speed / 4096.0 / freq + 0.5)
+        if prescale < 3:
+            raise ValueError("PCA9685 cannot output at the given frequency")
+        self.mode1_reg = _MODE1_ALLCALL | 0x10  # Mode 1, sleep
+        self.prescale_reg = prescale  # Prescale
+        self.mode1_reg = _MODE1_ALLCALL  # Mode 1
+        time.sleep(_OSCILLATOR_STARTUP)
+        # Mode 1, autoincrement on, All Call left on
+        self.mode1_reg = _MODE1_ALLCALL | 0xA0
+        for module in self.modules:
+            module._assume_reg("prescale_reg", prescale)
+            module._assume_reg("mode1_reg", _MODE1_ALLCALL | 0xA0)
+        self._frequency = freq
+
+    def _stage_duty(self, index: int, value: int) -> bool:
+        for module in self.modules:
+            module._stage_duty(index, value)
+        return super()._stage_duty(index, value)
+
+    def _forget_duty(self, first: int, end: int) -> None:
+        # The modules' shadows were staged along with the broadcast, a failed one leaves
+        # them unknown too, so writing the modules one by one afterwards is not skipped
+        for module in self.modules:
+            module._forget_duty(first, end)
+        super()._forget_duty(first, end)
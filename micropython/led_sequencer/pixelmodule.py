@@ -0,0 +1,96 @@
+"""
+WS2812 pixel strings as firefly modules for the animator.
+
+A string is cut into groups of 16 pixels, and each group stands in for a PCA9685:
+PixelModule has the set_frame(), set_many() and set_all() calls the animator and
+runsequence use, so sequences address the pixels with the next module letters after
+the PCA9685s ("e", "f", ... with the four modules a-d) and channels 0-15, and the
+designer maps them in LED_positions.json like any other module.
+
+Setting channels only turns the 16 bit duty cycles into colors in the string's pixel
+buffer.
+The animator calls PixelString.show() once per tick after flushing, so a frame costs
+one pixels_show() per string however many pixels changed, and no I2C at all. A DMA
+channel feeds the string, so the show only costs the dimming loop, and a string still
+busy with its last frame (about 30 us per pixel) keeps its changes for a later tick
+instead of holding up the animator.
+"""
+from array import array
+from ws2812 import WS2812
+
+CHANNELS_PER_MODULE = 16
+FIREFLY_COLOR = (255, 230, 60)  # Pixel color at full duty cycle, same as the designer preview
+
+class PixelString:
+    """
+    One WS2812 string, shown at most once per animator tick.
+
+    :param int pin_num: Data pin of the string
+    :param int led_count: Pixels on the string
+    :param int sm_id: PIO state machine for the string, one per pin
+    :param tuple color: (r, g, b) of a firefly at full brightness
+    """
+    def __init__(self, pin_num, led_count, sm_id, color=FIREFLY_COLOR):
+        self.strip = WS2812(pin_num, led_count, brightness=1, sm_id=sm_id)
+        self.dirty = False
+        # Pixel word per duty cycle level, rounded up so the faintest glow still lights a pixel
+        r, g, b = color
+        self.colors = array("I", [0] * 257)
+        for level in range(257):
+            scale = min(level, 255)
+            self.colors[level] = ((g * scale // 255) << 16) | ((r * scale // 255) << 8) | (b * scale // 255)
+        self.modules = [
+            PixelModule(self, first) for first in range(0, led_count, CHANNELS_PER_MODULE)
+        ]
+        """One PixelModule per 16 pixels, in pixel order"""
+
+    def show(self):
+        """Send the pixel buffer if any module changed it since the last show and the
+        string is done with the last frame"""
+        if self.dirty and self.strip.ready():
+            self.dirty = False
+            self.strip.pixels_show()
+
+    def off(self):
+        self.strip.pixels_fill((0, 0, 0))
+        self.dirty = False
+        self.strip.pixels_show()
+        while not self.strip.ready():
+            pass  # Let the DMA finish before a deepsleep cuts it short
+
+class PixelModule:
+    """
+    16 pixels of a PixelString, addressed like the channels of a PCA9685.
+
+    :param PixelString string: The string the pixels are on
+    :param int first_pixel: Pixel of channel 0
+    """
+    def __init__(self, string, first_pixel):
+        self.string = string
+        self.first_pixel = first_pixel
+        self.count = min(CHANNELS_PER_MODULE, string.strip.led_count - first_pixel)
+
+    def set_many(self, first, duty_cycles):
+        """Set channels ``first`` onwards from 16 bit duty cycles, like PCA9685.set_many()"""
+        pixels = self.string.strip.ar
+        colors = self.string.colors
+        base = self.first_pixel + first
+        for i in range(min(len(duty_cycles), self.count - first)):
+            pixels[base + i] = colors[(duty_cycles[i] + 0xFF) >> 8]
+        self.string.dirty = True
+
+    def set_frame(self, frame, first, count):
+        """Set channels ``first`` to ``first + count - 1`` from a 16 entry frame, like PCA9685.set_frame()"""
+        pixels = self.string.strip.ar
+        colors = self.string.colors
+        base = self.first_pixel
+        for i in range(first, min(first + count, self.count)):
+            pixels[base + i] = colors[(frame[i] + 0xFF) >> 8]
+        self.string.dirty = True
+
+    def set_all(self, value):
+        pixels = self.string.strip.ar
+        color = self.string.colors[(value + 0xFF) >> 8]
+        for i in range(self.first_pixel, self.first_pixel + self.count):
+            pixels[i] = color
+        self.string.dirty = True
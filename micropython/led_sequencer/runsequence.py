@@ -1,7 +1,17 @@
 import asyncio
 from machine import Pin, I2C, deepsleep, reset
 from photoresistor import photoresistor
-from micropython_pca9685 import PCA9685
+from boardconfig import PHOTORESISTOR_PIN, PCA_SWITCH_PIN, LIGHT_THRESHOLD, LIGHT_DETECTION_SLEEP
+from micropython_pca9685 import PCA9685, PCA9685AllCall
+from micropython_pca9685.i2c_profiler import I2CProfiler
+from animator import Animator, sleep_ms
+from i2cworker import I2CWorker
+from pixelmodule import PixelString
+from statusled import StatusLED
+from ws2812 import WS2812
+import binsequence
+import i2cclock
+import seqcache
 import random
 import neopixel
 import os
@@ -13,12 +23,16 @@ import gc
 MINIMUM_SEQUENCE_RUN = 3  # Minimum number of sequences to run
 MIN_SLEEP_TIME_BETWEEN_RUNS = 0  # Minimum sleep time in seconds
 MAX_SLEEP_TIME_BETWEEN_RUNS = 3  # Maximum sleep time in seconds
-LIGHT_DETECTION_SLEEP = 30  # Sleep time in seconds for light detection
 PWM_FREQUENCY = 2047  # PWM frequency for PCA9685
-PHOTORESISTOR_PIN = 29  # Pin for the photoresistor
-PCA_SWITCH_PIN = 28  # Pin to control the PCA9685 modules
-# PHOTORESISTOR_PIN = 28  # Pin for the photoresistor
-# PCA_SWITCH_PIN = 27  # Pin to control the PCA9685 modules
+PCA_REGISTER_CACHE = True  # Shadow PCA9685 registers in RAM to skip redundant I2C writes
+I2C_PROFILE = False  # Count I2C transactions, bytes and latency per module and register
+I2C_PROFILE_LOG = None  # File to append the profile to after each run, None prints it to serial
+DIAGNOSTICS = False  # Print module, timing, cache, animator and I2C worker stats after each run
+PCA_ADDRESSES = (0x40, 0x41, 0x42, 0x43)  # I2C addresses of the PCA9685 modules
+DUAL_CORE = False  # Write the animation frames to the modules from the second core
+# WS2812 firefly strings as (data pin, pixel count). Every 16 pixels are one more module,
+# lettered on from the PCA9685s: PIXEL_STRINGS = ((26, 64),) adds modules "e" to "h"
+PIXEL_STRINGS = ()
 
 # Board configuration - Change this to match your microcontroller
 BOARD_TYPE = "XIAO_RP2040"  # Options: "RP2040_ZERO" or "XIAO_RP2040"
@@ -34,10 +48,14 @@ else:  # Default to RP2040_ZERO
     SCL_PIN = 3  # SCL pin for I2C on RP2040 Zero
     NEOPIXEL_PIN = 16  # Pin connected to the NeoPixel LED
     
-PCA_MODULE_WARMUP_TIME = 1  # Time to wait for PCA9685 modules to warm up
-LIGHT_THRESHOLD = 2
+PCA_READY_TIMEOUT_MS = 1000  # Give up on the PCA9685 modules answering after power on
+PCA_READY_POLL_MS = 1  # Interval between readiness polls
 SEQUENCE_SLEEP_MIN = 1
 SEQUENCE_SLEEP_MAX = 5
+SEQUENCE_DIR = "sequences/"
+MAX_LATENESS_MS = 200  # Further behind than this, skip ahead instead of rushing steps to catch up
+PREFETCH_RAM_BUDGET = 48 * 1024  # Largest loaded sequence kept waiting to play, in bytes
+JSON_RAM_FACTOR = 3  # Rough heap bytes a parsed sequence takes per byte of JSON
 
 # error warning flashes
 SHORT = 0.125
@@ -50,35 +68,125 @@ LED_OFF = (0, 0, 0)  # Color to turn off the NeoPixel LED
 
 STATIC_CHOICES = [("a", 2), ("c", 14), ("c", 2), ("d", 2), ("b", 2), ("b", 13)]
 
-async def blink_LED(duration, color=RED):
-    if BOARD_TYPE == "XIAO_RP2040":
-        power = Pin(XIAO_POWER_PIN, Pin.OUT)
-        led = WS2812(XIAO_LED_PIN,1)
-        power.value(1)
-        led.pixels_fill(color)  # Set the color of the NeoPixel
-        led.pixels_show()
-        utime.sleep(duration)
-        power.value(0)
-    else:
-        led = neopixel.NeoPixel(Pin(NEOPIXEL_PIN), 1)
-        led[0] = color  # Set the color of the NeoPixel
-        led.write()
-        utime.sleep(duration)
-        led[0] = LED_OFF  # Set the color of the NeoPixel
-        led.write()  # Turn off the LED
+timing_report = {}  # file name -> (overrun ms, worst step lateness ms) of its last run
+i2c_profiler = None  # The wrapped I2C bus when I2C_PROFILE is on
+modules_ready_ms = None  # Time from switching the PCA9685 modules on to all of them answering
+status_led = None  # StatusLED on the board's RGB LED, set up once by setup_status_led()
+
+def setup_status_led():
+    global status_led
+    if status_led is None:
+        if BOARD_TYPE == "XIAO_RP2040":
+            status_led = StatusLED(WS2812(XIAO_LED_PIN, 1), power=Pin(XIAO_POWER_PIN, Pin.OUT), gap=BLINK_SLEEP)
+        else:
+            status_led = StatusLED(neopixel.NeoPixel(Pin(NEOPIXEL_PIN), 1), gap=BLINK_SLEEP)
+    return status_led
+
+def blink_led(durations, color=RED):
+    # Queue a status flash, one per duration in seconds, and return right away.
+    # The status LED task plays it without holding up the fades.
+    if status_led is not None:
+        status_led.show(durations, color)
 
 # Add this at strategic points in your code where memory might be an issue
 def collect_garbage():
     gc.collect()
     #print(f"Free memory: {gc.mem_free()} bytes")
 
-async def run_sequence(pca, file_name):
+def file_exists(path):
     try:
-        with uio.open("sequences/" + file_name, "r") as f:
-            json_data = ujson.load(f)
-            
-        end = len(json_data)
-        #print(f"Running sequence from file: {file_name}, total entries: {end}")
+        os.stat(path)
+        return True
+    except OSError:
+        return False
+
+def load_sequence(file_name):
+    # Returns a sequence ready to play: an open reader streaming the compiled binary
+    # form when it exists, otherwise the parsed JSON
+    path = SEQUENCE_DIR + file_name
+    compiled = binsequence.compiled_name(path)
+    if file_exists(compiled):
+        return binsequence.SequenceReader(compiled)
+    with uio.open(path, "r") as f:
+        return ujson.load(f)
+
+def read_sequence(file_name):
+    # Loads a sequence into RAM in a form that can be played again and again, for seqcache
+    path = SEQUENCE_DIR + file_name
+    compiled = binsequence.compiled_name(path)
+    if file_exists(compiled):
+        return binsequence.read_sequence(compiled)
+    with uio.open(path, "r") as f:
+        return ujson.load(f)
+
+def sequence_footprint(file_name):
+    # Estimated heap a loaded sequence holds on to, a compiled one only keeps its read buffer
+    path = SEQUENCE_DIR + file_name
+    if file_exists(binsequence.compiled_name(path)):
+        return binsequence.RECORD_SIZE * binsequence.RECORDS_PER_READ
+    return os.stat(path)[6] * JSON_RAM_FACTOR
+
+def prefetch_sequence(file_name):
+    # Loads a sequence ahead of playing it if it fits PREFETCH_RAM_BUDGET and the free heap.
+    # None when it doesn't or loading fails, run_sequence() then loads it and reports errors.
+    try:
+        footprint = sequence_footprint(file_name)
+        if footprint > PREFETCH_RAM_BUDGET:
+            return None
+        mem_free = getattr(gc, "mem_free", None)  # MicroPython only
+        if mem_free is not None:
+            gc.collect()
+            if mem_free() < 2 * footprint:
+                return None
+        return load_sequence(file_name)
+    except (OSError, ValueError):
+        return None
+
+def close_sequence(sequence):
+    # Release a loaded sequence that may never play, a compiled one holds its file open
+    if isinstance(sequence, binsequence.SequenceReader):
+        sequence.close()
+
+def sequence_steps(sequence):
+    # Yields (op, module, ch, brightness, sleeplen, wait, curve) per step of a loaded sequence,
+    # with the repeat blocks played out
+    if isinstance(sequence, binsequence.SequenceReader):
+        with sequence:
+            yield from binsequence.record_steps(sequence)
+    elif isinstance(sequence, memoryview):
+        yield from binsequence.record_steps(binsequence.records(sequence))
+    else:
+        yield from binsequence.node_steps(sequence)
+
+async def sleep_until(deadline):
+    # Sleep until a utime.ticks_ms() deadline, returns how many ms late it already was
+    remaining = utime.ticks_diff(deadline, utime.ticks_ms())
+    if remaining > 0:
+        await sleep_ms(remaining)
+        return 0
+    await sleep_ms(0)  # Still yield to the event loop while catching up
+    return -remaining
+
+async def wait_for_tails(animator, deadline):
+    # Sleep until the fade tails of the last sequence have played out, or the deadline.
+    # True when they have, the static throb's ramps don't count.
+    while animator.fading:
+        if utime.ticks_diff(deadline, utime.ticks_ms()) <= 0:
+            return False
+        await sleep_ms(animator.tick_ms)
+    return True
+
+async def run_sequence(animator, file_name, sequence=None, cache=False):
+    try:
+        #print(f"Running sequence from file: {file_name}")
+        if sequence is None:
+            # Sequences played over and over are parsed once and kept in seqcache
+            sequence = seqcache.get(file_name, read_sequence) if cache else load_sequence(file_name)
+
+        # Steps are paced against absolute deadlines so I2C and event loop latency don't add up
+        start = deadline = utime.ticks_ms()
+        authored_ms = 0
+        worst_late = 0
 
         # Keep track of the last channel and module
         last_ch = None
@@ -89,45 +197,51 @@ async def run_sequence(pca, file_name):
             is_static = True
         
         static_substitutions = random.choice(STATIC_CHOICES)
+        static_module = ord(static_substitutions[0]) - ord('a')
 
-        for i in range(end):
-            
-            #print(f"json_data[{i}]={json_data[i]}")
+        for op, module, ch, brightness, sleeplen, wait, curve in sequence_steps(sequence):
 
             if is_static:
                 #print(f"static_substitutions={static_substitutions}")
-                m = static_substitutions[0]
+                module = static_module
                 ch = static_substitutions[1]
-            else:
-                m = json_data[i]['m']
-                ch = json_data[i]['ch']
 
-            #print(f"is_static={is_static}, ch={ch}, m={m}")
-            module = ord(m) - ord('a')
-            brightness = json_data[i]['lu']
-            sleeplen = json_data[i]['s']
+            #print(f"is_static={is_static}, ch={ch}, module={module}")
             
-            # Skip creating a fade task (tail) if this is the same channel and module as the last one
-            if last_ch != ch or last_module != module:
+            step_ms = round(wait * 1000)  # Not int(), 1.001 s is 1000.9999 ms as a float
+
+            if op != binsequence.OP_STEP:
+                # Level and ramp steps are interpolated by the animator, then held
+                animator.ramp(module, ch, brightness, sleeplen if op == binsequence.OP_RAMP else 0, curve)
+                step_ms += round(sleeplen * 1000)
+            # Skip starting a fade (tail) if this is the same channel and module as the last one
+            elif last_ch != ch or last_module != module:
                 #print(f"fade module={module} ch={ch}, brightness={brightness}, sleep={sleeplen}")
-                asyncio.create_task(fade(pca[module], ch, brightness, sleeplen)) # Create a task for each LED
+                animator.start(module, ch, brightness, sleeplen) # Fade envelope played by the animator task
             else:
                 #print(f"fade module={module} ch={ch}, brightness={brightness}, sleep={sleeplen}")
-                pca[module].channels[ch].duty_cycle = percentage_to_duty_cycle(brightness)
-                #pca.channels[ch].duty_cycle = percentage_to_duty_cycle(brightness)
-                await asyncio.sleep(sleeplen)
+                animator.set_level(module, ch, brightness)
+                step_ms += round(sleeplen * 1000)  # Hold the level for sleeplen before the wait
                 
             # Update the last channel and module
             last_ch = ch
             last_module = module
             
-            await asyncio.sleep(json_data[i]['w'])
+            authored_ms += step_ms
+            deadline = utime.ticks_add(deadline, step_ms)
+            late = await sleep_until(deadline)
+            worst_late = max(worst_late, late)
+            if late > MAX_LATENESS_MS:
+                deadline = utime.ticks_ms()  # Too far behind, drop the backlog
+
+        timing_report[file_name] = (utime.ticks_diff(utime.ticks_ms(), start) - authored_ms, worst_late)
         return True
     except OSError as e:
         #print(f"Error opening file {file_name}: {e}")
         blink_led(LONG, RED)
         return False
-    except ujson.JSONDecodeError:
+    except ValueError:
+        # MicroPython's ujson has no JSONDecodeError, a parse error is a ValueError
         blink_led(LONG, GREEN)
         #print(f"Error parsing JSON in file {file_name}")
         return False
@@ -136,74 +250,127 @@ async def run_sequence(pca, file_name):
         #print(f"Unexpected error: {e}")
         return False
 
-def percentage_to_duty_cycle(percentage):
-    return int((percentage / 100) * 0xFFFF)
-
-async def fade(pca, ch, brightness, sleeplen=0.25, fadevalue=0.01):
-    iterations = max(1, int(sleeplen/fadevalue))
-    step_value = brightness / iterations
-    
-    # Fade up
-    for i in range(iterations):
-        duty_cycle = percentage_to_duty_cycle((i+1) * step_value)
-        pca.channels[ch].duty_cycle = duty_cycle
-        await asyncio.sleep(fadevalue)
-    
-    # Fade down
-    for i in range(iterations):
-        duty_cycle = percentage_to_duty_cycle(brightness - ((i+1) * step_value))
-        pca.channels[ch].duty_cycle = duty_cycle
-        await asyncio.sleep(fadevalue)
-    
-    # Ensure LED is fully off
-    pca.channels[ch].duty_cycle = 0
-
 def custom_shuffle(lst):
     for i in range(len(lst) - 1, 0, -1):
         j = random.randint(0, i)
         lst[i], lst[j] = lst[j], lst[i]
 
+async def wait_for_modules(i2c, powered_at, timeout_ms=PCA_READY_TIMEOUT_MS):
+    # Polls until every module ACKs and its MODE1 register reads back, returns the ms since powered_at
+    pending = list(PCA_ADDRESSES)
+    while True:
+        for address in pending[:]:
+            try:
+                i2c.readfrom_mem(address, 0x00, 1)  # MODE1
+                pending.remove(address)
+            except OSError:
+                pass
+        elapsed = utime.ticks_diff(utime.ticks_ms(), powered_at)
+        if not pending:
+            return elapsed
+        if elapsed >= timeout_ms:
+            raise OSError(f"PCA9685 modules {[hex(address) for address in pending]} not ready")
+        await sleep_ms(PCA_READY_POLL_MS)
+
+def make_i2c(freq):
+    return I2C(1, sda=Pin(SDA_PIN), scl=Pin(SCL_PIN), freq=freq)  # Correct I2C pins for rp2040 and wemos S2 mini
+
+async def setup_bus():
+    # Run the bus at the fastest clock all modules pass a readback check at,
+    # stepping down a clock if setting up the modules still fails
+    global i2c_profiler
+    i2c, freq = i2cclock.select(make_i2c, PCA_ADDRESSES)
+    while True:
+        if I2C_PROFILE:
+            i2c = i2c_profiler = I2CProfiler(i2c)
+        try:
+            return await setup_pca_modules(i2c)
+        except OSError:
+            freq = i2cclock.slower(freq)
+            if freq is None:
+                raise
+            i2cclock.save_clock(freq)
+            i2c = make_i2c(freq)
+
 async def setup_pca_modules(i2c):
-    pca_A = PCA9685(i2c, address=0x40)
-    pca_B = PCA9685(i2c, address=0x41)
-    pca_C = PCA9685(i2c, address=0x42)
-    pca_D = PCA9685(i2c, address=0x43)
+    pca = [PCA9685(i2c, address=address, cache=PCA_REGISTER_CACHE, reset=False) for address in PCA_ADDRESSES]
+    allcall = PCA9685AllCall(i2c, pca)
 
-    pca_A.frequency = pca_B.frequency = pca_C.frequency = pca_D.frequency = PWM_FREQUENCY
-    pca = [pca_A, pca_B, pca_C, pca_D]
-    
-    # Initialize all channels to 0% duty cycle
-    for pca_instance in pca:
-        for channel in pca_instance.channels:
-            channel.duty_cycle = 0
+    try:
+        # Modules come out of power on with LED All Call enabled: set the frequency and
+        # initialize all channels to 0% duty cycle on every module at once
+        allcall.frequency = PWM_FREQUENCY
+        allcall.set_all(0)
+    except OSError:
+        # No module answered the broadcast address, set them up one by one
+        allcall = None
+        for pca_instance in pca:
+            pca_instance.reset()
+            pca_instance.frequency = PWM_FREQUENCY
+            pca_instance.set_all(0)
     
-    return pca
+    return pca, allcall
+
+async def run_show(pca, allcall, strings, files, first_sequence):
+    # Animate the sequences on the set up modules, then stop every task the show started
+    worker = None
+    if DUAL_CORE:
+        worker = I2CWorker(pca)
+        worker.start()
+    modules = pca + [module for string in strings for module in string.modules]
+    animator = Animator(modules, allcall=allcall, worker=worker, strings=strings)
+    animator_task = asyncio.create_task(animator.run())
+    stop_event = asyncio.Event()
+    static_task = asyncio.create_task(run_static_sequences_continuously(animator, stop_event))
+    try:
+        await run_sequences(animator, files, first_sequence)
+    finally:
+        stop_event.set()
+        await static_task
+        animator.stop()
+        await animator_task
+        if worker is not None:
+            worker.stop()
 
 # Define the main function to run the event loop
 async def main(light, pcaswitch, files):
+    global modules_ready_ms
     #print("Checking light level...")
     if light.read() < LIGHT_THRESHOLD: # Check if the light level is below a certain threshold
         #print("Light level is low, running sequences")
-        custom_shuffle(files)  # Use the custom shuffle function
-
-        # Setup I2C and PCA modules
-        i2c = I2C(1, sda=Pin(SDA_PIN), scl=Pin(SCL_PIN))  # Correct I2C pins for rp2040 and wemos S2 mini
         pcaswitch.off()  # Turn on the PCA9685 modules (PNP)
+        powered_at = utime.ticks_ms()
         #print("PCA9685 modules are on")
-        utime.sleep(PCA_MODULE_WARMUP_TIME) # Allow time for the PCA9685 modules to initialize
+
+        # Shuffle and load the first sequence while the modules power up
+        custom_shuffle(files)  # Use the custom shuffle function
+        first_sequence = prefetch_sequence(files[0])
+        # PIO state machine 0 is left to the status LED
+        strings = [PixelString(pin, count, sm_id) for sm_id, (pin, count) in enumerate(PIXEL_STRINGS, 1)]
+        status = setup_status_led()
+        status_task = asyncio.create_task(status.run())
         
         try:
-            pca = await setup_pca_modules(i2c)
-            stop_event = asyncio.Event()
-            static_task = asyncio.create_task(run_static_sequences_continuously(pca, stop_event))
             try:
-                await run_sequences(pca, files)
-            finally:
-                stop_event.set()
-                await static_task
+                # Wait for the modules at the slowest clock, then setup I2C and PCA modules
+                modules_ready_ms = await wait_for_modules(make_i2c(i2cclock.CLOCK_CANDIDATES[-1]), powered_at)
+                pca, allcall = await setup_bus()
+            except OSError as e:
+                # Modules missing or not answering, flash it and try again after the deepsleep
+                #print(f"PCA9685 setup failed: {e}")
+                pca = None
+                blink_led([LONG, SHORT, SHORT], RED)
+            if pca is not None:
+                await run_show(pca, allcall, strings, files, first_sequence)
+            else:
+                close_sequence(first_sequence)
         finally:
             # Ensure we turn off the modules even if an error occurs
             pcaswitch.on()  # PNP, turn off the PCA9685 modules
+            for string in strings:
+                string.off()
+            status.stop()
+            await status_task  # Let a queued error flash finish before sleeping
         
         #utime.sleep(5)  # Allow time for the last sequence to finish
         deepsleep(1000 * random.randrange(MIN_SLEEP_TIME_BETWEEN_RUNS, MAX_SLEEP_TIME_BETWEEN_RUNS))
@@ -214,51 +381,81 @@ async def main(light, pcaswitch, files):
         #utime.sleep(LIGHT_DETECTION_SLEEP)
         deepsleep(LIGHT_DETECTION_SLEEP * 1000) # sleep before sampling for sunlight level
 
-async def run_sequences(pca, files):
+async def run_sequences(animator, files, first_sequence=None):
     iterEnd = random.randint(MINIMUM_SEQUENCE_RUN, len(files))
+    prepared = first_sequence  # At most one sequence loaded ahead of playing
     try:
         for i in range(iterEnd):
-            await run_sequence(pca, files[i])
-            await asyncio.sleep(random.randint(SEQUENCE_SLEEP_MIN, SEQUENCE_SLEEP_MAX))
+            await run_sequence(animator, files[i], prepared)
+            prepared = None
+            gap_end = utime.ticks_add(utime.ticks_ms(), 1000 * random.randint(SEQUENCE_SLEEP_MIN, SEQUENCE_SLEEP_MAX))
+            if i + 1 < iterEnd and await wait_for_tails(animator, gap_end):
+                # Parse the next sequence once the tails are done rather than when it starts
+                # playing, ujson.load() and gc.collect() would stall the fades still on
+                prepared = prefetch_sequence(files[i + 1])
+            await sleep_until(gap_end)
+
+        if DIAGNOSTICS:
+            print(f"Modules ready {modules_ready_ms} ms after power on")
+            for file_name, (overrun, worst_late) in timing_report.items():
+                print(f"Timing {file_name}: overrun {overrun} ms, worst step {worst_late} ms late")
+            print(f"Sequence cache: {seqcache.hits} hits, {seqcache.misses} misses")
+            print(f"Animator: {animator.dropped_ticks} dropped ticks, worst tick {animator.max_late_ms} ms late, {animator.bus_errors} bus errors")
+            if animator.worker is not None:
+                worker = animator.worker
+                print(f"I2C worker: {worker.flushed} frames, {worker.ring_full} held back, {worker.errors} errors")
+        if i2c_profiler:
+            i2c_profiler.dump(I2C_PROFILE_LOG)
 
     except Exception as e:
         blink_led([SHORT, SHORT, SHORT])
         print(f"Error running sequences: {e}")
         # Turn off all LEDs in case of error
-        for pca_instance in pca:
-            for channel in pca_instance.channels:
-                channel.duty_cycle = 0
+        animator.blackout()
+    finally:
+        # Cancelled or failed between a prefetch and playing it
+        close_sequence(prepared)
 
-async def run_static_sequences_continuously(pca, stop_event):
+async def run_static_sequences_continuously(animator, stop_event):
     static_files = ["static_longthrob_sequence.json", "static_shortthrob_sequence.json"]
     while not stop_event.is_set():
         for file_name in static_files:
-            await run_sequence(pca, file_name)
+            await run_sequence(animator, file_name, cache=True)
             await asyncio.sleep(0)  # Yield to event loop
     
-if __name__ == "__main__":
+def start(light=None, pcaswitch=None):
+    # Entry point, sentinel.py (main.py on the board) calls it with the light sensor and
+    # switch it already set up
     try:
         # Create and run the event loop
-        light = photoresistor(PHOTORESISTOR_PIN)
-        pcaswitch = Pin(PCA_SWITCH_PIN, Pin.OUT)
-        pcaswitch.on()  # PNP, turn off the PCA9685 modules
+        if light is None:
+            light = photoresistor(PHOTORESISTOR_PIN)
+        if pcaswitch is None:
+            pcaswitch = Pin(PCA_SWITCH_PIN, Pin.OUT)
+            pcaswitch.on()  # PNP, turn off the PCA9685 modules
 
-        dir = "sequences/"
+        dir = SEQUENCE_DIR
         try:
-            files = os.listdir(dir)
+            files = binsequence.prefer_compiled(os.listdir(dir))
         except OSError:
             #print(f"Error: '{dir}' directory not found or empty")
             files = []
        
         if files:
-            loop = asyncio.get_event_loop()
-            loop.create_task(main(light, pcaswitch, files))
-            loop.run_forever()
+            # asyncio.run() hands an exception escaping main() to the fatal path below
+            asyncio.run(main(light, pcaswitch, files))
         else:
             #print("No sequence files found. Going to sleep.")
             deepsleep(LIGHT_DETECTION_SLEEP * 1000)
     except Exception as e:
-        blink_led([SHORT, SHORT, SHORT, LONG, LONG, LONG, SHORT, SHORT, SHORT])
         print(f"Fatal error: {e}")
+        try:
+            # The event loop is gone, flash SOS right away before resetting
+            setup_status_led().flash([SHORT, SHORT, SHORT, LONG, LONG, LONG, SHORT, SHORT, SHORT], RED)
+        except Exception:
+            pass
         # Try to ensure clean shutdown
-        reset()
\ No newline at end of file
+        reset()
+
+if __name__ == "__main__":
+    start()
@@ -0,0 +1,25 @@
+"""
+First stage of the boot, copy this file to the board as main.py.
+
+The board wakes from deepsleep() every LIGHT_DETECTION_SLEEP seconds all day long just
+to find it is still light out. This stage only imports machine and the photoresistor,
+reads the light level and goes straight back to sleep. Only when it is dark does it
+import runsequence, and with it asyncio, the PCA9685 driver and the sequence engine.
+benchmark_boot.py measures what that saves per wake. The pins and light settings are
+in boardconfig.py, which runsequence reads as well.
+"""
+from machine import Pin, deepsleep
+from photoresistor import photoresistor
+from boardconfig import PHOTORESISTOR_PIN, PCA_SWITCH_PIN, LIGHT_THRESHOLD, LIGHT_DETECTION_SLEEP
+
+def run():
+    pcaswitch = Pin(PCA_SWITCH_PIN, Pin.OUT)
+    pcaswitch.on()  # PNP, turn off the PCA9685 modules
+    light = photoresistor(PHOTORESISTOR_PIN)
+    if light.read() >= LIGHT_THRESHOLD:
+        deepsleep(LIGHT_DETECTION_SLEEP * 1000)  # sleep before sampling for sunlight level
+    import runsequence  # Dark: now load the show
+    runsequence.start(light, pcaswitch)
+
+if __name__ == "__main__":
+    run()
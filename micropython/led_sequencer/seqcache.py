@@ -0,0 +1,54 @@
+"""
+Parse-once cache for sequences that replay over and over, like the static throbs.
+
+Loaded sequences are kept by file name and handed out again on the next play, so a
+sequence looping for the whole show is read from flash and parsed once. The least
+recently used entries are dropped when there are more than CACHE_SIZE, or when the
+free heap falls below MIN_FREE_HEAP after adding one; the entry just loaded always
+stays. hits and misses count lookups since the last clear().
+
+Cached sequences are played many times, so they must be reusable: a parsed JSON list
+or binsequence.read_sequence() records, never a streaming SequenceReader.
+"""
+import gc
+
+CACHE_SIZE = 4  # Sequences kept in RAM
+MIN_FREE_HEAP = 32 * 1024  # Evict until at least this much heap is free, in bytes
+
+_cache = {}
+_cache_order = []  # Least recently used first
+hits = 0
+misses = 0
+
+def get(file_name, load):
+    """The cached sequence for ``file_name``, calling ``load(file_name)`` on a miss"""
+    global hits, misses
+    sequence = _cache.get(file_name)
+    if sequence is not None:
+        hits += 1
+        _cache_order.remove(file_name)
+        _cache_order.append(file_name)
+        return sequence
+    misses += 1
+    sequence = load(file_name)
+    _cache[file_name] = sequence
+    _cache_order.append(file_name)
+    _trim()
+    return sequence
+
+def _trim():
+    while len(_cache_order) > CACHE_SIZE:
+        del _cache[_cache_order.pop(0)]
+    mem_free = getattr(gc, "mem_free", None)  # MicroPython only
+    if mem_free is None:
+        return
+    gc.collect()
+    while len(_cache_order) > 1 and mem_free() < MIN_FREE_HEAP:
+        del _cache[_cache_order.pop(0)]
+        gc.collect()
+
+def clear():
+    global hits, misses
+    _cache.clear()
+    del _cache_order[:]
+    hits = misses = 0
@@ -0,0 +1,93 @@
+"""
+Status LED patterns that never hold up the light show.
+
+One StatusLED owns the board's RGB LED, set up once: the XIAO RP2040's WS2812 (with
+its power pin) or the RP2040-Zero's NeoPixel. show() only queues a pattern, a list of
+on durations in seconds flashed in one color, and returns. A single long-lived task,
+run(), plays the queue with asyncio.sleep, so a flash on an error path costs the
+fades nothing. When the queue is full new patterns are dropped rather than piling up.
+
+flash() plays a pattern right away and blocks, for when no event loop is running any
+more, like just before a reset.
+"""
+import asyncio
+import utime
+
+QUEUE_SIZE = 4  # Patterns waiting to play
+GAP = 0.25  # Seconds dark between flashes
+OFF = (0, 0, 0)
+
+class StatusLED:
+    """
+    Plays queued color patterns on the board's RGB LED.
+
+    :param led: ws2812.WS2812 or neopixel.NeoPixel with the LED as pixel 0
+    :param power: Optional Pin switching the LED's supply, on only while it is lit
+    :param float gap: Seconds dark between flashes
+    """
+    def __init__(self, led, power=None, gap=GAP):
+        self.led = led
+        self.power = power
+        self.gap = gap
+        self._queue = []
+        self._wake = asyncio.Event()
+        self._stopped = False  # Set by stop(), which may come before run() first gets to run
+        self.dropped = 0
+        """Patterns dropped because the queue was full"""
+        self._set(OFF)
+
+    def _set(self, color):
+        if self.power is not None and color != OFF:
+            self.power.value(1)
+        if hasattr(self.led, "pixels_fill"):
+            self.led.pixels_fill(color)
+            self.led.pixels_show()
+        else:
+            self.led[0] = color
+            self.led.write()
+        if self.power is not None and color == OFF:
+            self.power.value(0)
+
+    def show(self, durations, color):
+        """Queue flashes of ``color``, one per duration in seconds (a single number is one flash)"""
+        if len(self._queue) >= QUEUE_SIZE:
+            self.dropped += 1
+            return
+        if not isinstance(durations, (list, tuple)):
+            durations = (durations,)
+        self._queue.append((durations, color))
+        self._wake.set()
+
+    @property
+    def busy(self):
+        return bool(self._queue)
+
+    async def run(self):
+        """Play queued patterns until stop() is called and the queue is empty"""
+        while not self._stopped or self._queue:
+            if not self._queue:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            durations, color = self._queue[0]
+            for duration in durations:
+                self._set(color)
+                await asyncio.sleep(duration)
+                self._set(OFF)
+                await asyncio.sleep(self.gap)
+            self._queue.pop(0)
+
+    def stop(self):
+        """Let run() finish what is queued and return"""
+        self._stopped = True
+        self._wake.set()
+
+    def flash(self, durations, color):
+        """Play a pattern now, blocking. Only for when the event loop is gone."""
+        if not isinstance(durations, (list, tuple)):
+            durations = (durations,)
+        for duration in durations:
+            self._set(color)
+            utime.sleep(duration)
+            self._set(OFF)
+            utime.sleep(self.gap)
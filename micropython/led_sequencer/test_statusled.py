@@ -0,0 +1,57 @@
+"""
+Checks for StatusLED that need no hardware, run them on the board or on CPython
+against the emulator (python test_statusled.py).
+"""
+import sys
+if sys.implementation.name != "micropython":
+    import os
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "emulator"))
+
+import asyncio
+from statusled import StatusLED
+
+RED = (255, 0, 0)
+
+class FakeLED:
+    """Stands in for a NeoPixel, remembers every color written"""
+    def __init__(self):
+        self.pixel = (0, 0, 0)
+        self.writes = []
+
+    def __setitem__(self, index, color):
+        self.pixel = color
+
+    def write(self):
+        self.writes.append(self.pixel)
+
+async def stop_before_run():
+    # main() can stop the status LED before its task has first been scheduled
+    led = FakeLED()
+    status = StatusLED(led, gap=0)
+    status.show([0.01], RED)
+    task = asyncio.create_task(status.run())
+    status.stop()
+    await asyncio.wait_for(task, 1)
+    assert RED in led.writes, "queued pattern not played"
+    assert led.pixel == (0, 0, 0), "left lit"
+
+async def stop_while_idle():
+    status = StatusLED(FakeLED(), gap=0)
+    task = asyncio.create_task(status.run())
+    await asyncio.sleep(0.01)
+    status.stop()
+    await asyncio.wait_for(task, 1)
+
+async def full_queue_drops():
+    status = StatusLED(FakeLED(), gap=0)
+    for _ in range(6):
+        status.show(0.001, RED)
+    assert status.dropped == 2, status.dropped
+
+def main():
+    for test in (stop_before_run, stop_while_idle, full_queue_drops):
+        asyncio.run(test())
+        print(f"OK: {test.__name__}")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,21 @@
 import array, time
+from utime import ticks_us, ticks_add, ticks_diff
 from machine import Pin
 import rp2
 
 # Configure the number of WS2812 LEDs.
 #brightness = 0.2
-@rp2.asm_pio(sideset_init=rp2.PIO.OUT_LOW, out_shiftdir=rp2.PIO.SHIFT_LEFT, autopull=True,pull_thresh=24)
+PIXEL_US = 30  # Time to shift out one pixel, 24 bits at 800 kHz
+BYTE_US = 10  # Time to shift out one color byte
+LATCH_US = 280  # Line held low this long latches the frame (WS2812B V5 and later)
+FIFO_WORDS = 4  # Bytes still queued in the PIO TX FIFO when put() returns
+STATE_MACHINE_ID = 0  # Default PIO state machine, give each string on its own pin another one
+PIO_TX_FIFO = (0x50200010, 0x50300010)  # TXF0 of PIO0 and PIO1, state machine n's is 4n on
+DREQ_PIO_TX = (0, 8)  # DREQ_PIO0_TX0 and DREQ_PIO1_TX0
+
+# One color byte per FIFO word, in its top 8 bits: put() shifts the bytes up by 24, and an
+# 8 bit DMA write to the FIFO lands in every byte lane of the word
+@rp2.asm_pio(sideset_init=rp2.PIO.OUT_LOW, out_shiftdir=rp2.PIO.SHIFT_LEFT, autopull=True,pull_thresh=8)
 def ws2812():
     T1 = 2
     T2 = 5
@@ -17,24 +28,88 @@ def ws2812():
     label("do_zero")
     nop() .side(0) [T2 - 1]
     wrap()
+
+_state_machines = {}  # State machine id -> [pin number, StateMachine, DMA feeder]
+
+def _dma_feeder(sm_id):
+    # (DMA channel, TX FIFO address, control word) pacing bytes into the state machine,
+    # None on firmware without rp2.DMA, pixels_show() then feeds it with put()
+    if not hasattr(rp2, "DMA"):
+        return None
+    pio, index = divmod(sm_id, 4)
+    dma = rp2.DMA()
+    ctrl = dma.pack_ctrl(size=0, inc_write=False, treq_sel=DREQ_PIO_TX[pio] + index)
+    return dma, PIO_TX_FIFO[pio] + 4 * index, ctrl
+
+def state_machine(pin_num, sm_id=STATE_MACHINE_ID):
+    """A WS2812 PIO state machine, created once per process and id and moved if the pin changes"""
+    entry = _state_machines.get(sm_id)
+    if entry is None:
+        sm = rp2.StateMachine(sm_id, ws2812, freq=8_000_000, sideset_base=Pin(pin_num))
+        sm.active(1)
+        _state_machines[sm_id] = [pin_num, sm, _dma_feeder(sm_id)]
+        return sm
+    if entry[0] != pin_num:
+        entry[1].init(ws2812, freq=8_000_000, sideset_base=Pin(pin_num))
+        entry[1].active(1)
+        entry[0] = pin_num
+    return entry[1]
+
 class WS2812():        
-    def __init__(self, pin_num, led_count, brightness = 0.5):
+    def __init__(self, pin_num, led_count, brightness = 0.5, sm_id = STATE_MACHINE_ID):
         self.Pin = Pin
         self.led_count = led_count
-        self.brightness = brightness
-        self.sm = rp2.StateMachine(0, ws2812, freq=8_000_000, sideset_base=Pin(pin_num))
-        self.sm.active(1)
+        self.sm = state_machine(pin_num, sm_id)
+        self._feeder = _state_machines[sm_id][2]
         self.ar = array.array("I", [0 for _ in range(led_count)])
-        
+        self._out = bytearray(3 * led_count)  # Dimmed G, R, B bytes handed to the PIO
+        self._table = bytearray(256)
+        self._ready_at = ticks_us()
+        self.brightness = brightness
+
+    @property
+    def brightness(self):
+        return self._brightness
+
+    @brightness.setter
+    def brightness(self, brightness):
+        # One lookup per color byte in pixels_show() instead of float math
+        self._brightness = brightness
+        scale = int(brightness * 256 + 0.5)
+        for v in range(256):
+            self._table[v] = min(255, (v * scale) >> 8)
+
+    def ready(self):
+        """True once the last frame has been latched and the next one can be sent"""
+        return ticks_diff(ticks_us(), self._ready_at) >= 0
+
     def pixels_show(self):
-        dimmer_ar = array.array("I", [0 for _ in range(self.led_count)])
-        for i,c in enumerate(self.ar):
-            r = int(((c >> 8) & 0xFF) * self.brightness)
-            g = int(((c >> 16) & 0xFF) * self.brightness)
-            b = int((c & 0xFF) * self.brightness)
-            dimmer_ar[i] = (g<<16) + (r<<8) + b
-        self.sm.put(dimmer_ar, 8)
-        time.sleep_ms(10)
+        """Send the pixels, dimmed by brightness, without allocating. A DMA channel paces
+        the bytes into the state machine, so this returns without waiting for the string;
+        only a show before ready() waits for the last frame to go out and latch. On
+        firmware without rp2.DMA, put() blocks about PIXEL_US per pixel instead."""
+        # The DMA may still be reading _out, and the last frame has to latch
+        while ticks_diff(ticks_us(), self._ready_at) < 0:
+            pass
+        table = self._table
+        ar = self.ar
+        out = self._out
+        j = 0
+        for i in range(self.led_count):
+            c = ar[i]
+            out[j] = table[(c >> 16) & 0xFF]
+            out[j + 1] = table[(c >> 8) & 0xFF]
+            out[j + 2] = table[c & 0xFF]
+            j += 3
+        feeder = self._feeder
+        if feeder is None:
+            self.sm.put(out, 24)
+            queued = len(out) if len(out) < FIFO_WORDS else FIFO_WORDS
+        else:
+            dma, fifo, ctrl = feeder
+            dma.config(read=out, write=fifo, count=len(out), ctrl=ctrl, trigger=True)
+            queued = len(out)
+        self._ready_at = ticks_add(ticks_us(), (queued + 1) * BYTE_US + LATCH_US)
 
     def pixels_set(self, i, color):
         self.ar[i] = (color[1]<<16) + (color[0]<<8) + color[2]